@@ -0,0 +1,27 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "202610180001"
+down_revision = "202407010001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fsm_states",
+        sa.Column("bot_id", sa.BigInteger(), nullable=False),
+        sa.Column("chat_id", sa.BigInteger(), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("thread_id", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("destiny", sa.String(length=64), nullable=False, server_default="default"),
+        sa.Column("state", sa.String(length=255), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("bot_id", "chat_id", "user_id", "thread_id", "destiny"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("fsm_states")
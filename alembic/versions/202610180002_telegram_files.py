@@ -0,0 +1,25 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "202610180002"
+down_revision = "202610180001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "telegram_files",
+        sa.Column("file_unique_id", sa.String(length=128), primary_key=True),
+        sa.Column("path", sa.String(length=1024), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_telegram_files_path", "telegram_files", ["path"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_telegram_files_path", table_name="telegram_files")
+    op.drop_table("telegram_files")
@@ -0,0 +1,29 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "202610180003"
+down_revision = "202610180002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "track_analyses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("release_id", sa.Integer(), sa.ForeignKey("releases.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("duration", sa.Float(), nullable=False),
+        sa.Column("peak_dbfs", sa.Float(), nullable=True),
+        sa.Column("true_peak_dbfs", sa.Float(), nullable=True),
+        sa.Column("lufs", sa.Float(), nullable=True),
+        sa.Column("clipped_samples", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("envelope", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_track_analyses_release_id", "track_analyses", ["release_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_track_analyses_release_id", table_name="track_analyses")
+    op.drop_table("track_analyses")
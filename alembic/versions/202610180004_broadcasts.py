@@ -0,0 +1,33 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "202610180004"
+down_revision = "202610180003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("blocked_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_table(
+        "broadcast_campaigns",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False, server_default="running"),
+        sa.Column("created_by", sa.BigInteger(), nullable=True),
+        sa.Column("last_user_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sent", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("blocked", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_broadcast_campaigns_status", "broadcast_campaigns", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_broadcast_campaigns_status", table_name="broadcast_campaigns")
+    op.drop_table("broadcast_campaigns")
+    op.drop_column("users", "blocked_at")
@@ -0,0 +1,18 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "202610180005"
+down_revision = "202610180004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("mail_outbox", sa.Column("lease_owner", sa.String(length=128), nullable=True))
+    op.add_column("mail_outbox", sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("mail_outbox", "lease_expires_at")
+    op.drop_column("mail_outbox", "lease_owner")
@@ -0,0 +1,43 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "202610180006"
+down_revision = "202610180005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_mail_outbox_status_scheduled_at_id", "mail_outbox", ["status", "scheduled_at", "id"])
+    op.create_index("ix_mail_outbox_status_sent_at", "mail_outbox", ["status", "sent_at"])
+    op.create_index(
+        "ix_mail_outbox_pending",
+        "mail_outbox",
+        ["scheduled_at", "id"],
+        postgresql_where=sa.text("status = 'pending'"),
+        sqlite_where=sa.text("status = 'pending'"),
+    )
+    op.create_table(
+        "mail_outbox_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("to_email", sa.String(length=255), nullable=False),
+        sa.Column("subject", sa.String(length=255), nullable=False),
+        sa.Column("html", sa.Text(), nullable=True),
+        sa.Column("text", sa.Text(), nullable=True),
+        sa.Column("attachments", sa.JSON(), nullable=True),
+        sa.Column("message_key", sa.String(length=128), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_mail_outbox_archive_message_key", "mail_outbox_archive", ["message_key"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_mail_outbox_archive_message_key", table_name="mail_outbox_archive")
+    op.drop_table("mail_outbox_archive")
+    op.drop_index("ix_mail_outbox_pending", table_name="mail_outbox")
+    op.drop_index("ix_mail_outbox_status_sent_at", table_name="mail_outbox")
+    op.drop_index("ix_mail_outbox_status_scheduled_at_id", table_name="mail_outbox")
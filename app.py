@@ -8,6 +8,7 @@ from app.bot import create_bot, create_dispatcher
 from app.config import load_settings
 from app.database.session import Database
 from app.logging import configure_logging, logger
+from app.web import create_web_app, run_web_app, setup_bot_webhook
 
 
 async def _main() -> None:
@@ -20,9 +21,15 @@ async def _main() -> None:
     bot = create_bot(settings)
     dispatcher = create_dispatcher(settings, database)
 
-    logger.info("Starting bot polling")
     try:
-        await dispatcher.start_polling(bot)
+        if settings.use_webhook:
+            logger.info("Starting bot in webhook mode")
+            web_app = create_web_app(settings, database, bot)
+            setup_bot_webhook(web_app, dispatcher, bot, settings)
+            await run_web_app(web_app, settings)
+        else:
+            logger.info("Starting bot polling")
+            await dispatcher.start_polling(bot)
     except TelegramNetworkError as error:
         logger.error("Telegram network error: %s", error)
     finally:
@@ -1,32 +1,99 @@
 from __future__ import annotations
 
+from functools import partial
+
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
 
+from app.broadcast import BroadcastEngine
+from app.catalog import CatalogStore
 from app.config import Settings
 from app.database.session import Database
-from app.bot.handlers import menu, release
+from app.bot.catalog import build_catalog_view
+from app.bot.handlers import admin, menu, release
 from app.bot.middlewares.db import DatabaseSessionMiddleware
 from app.bot.middlewares.settings import SettingsMiddleware
+from app.bot.middlewares.throttling import ThrottlingMiddleware
+from app.bot.outbound import OutboundLimiter, outbound_limiter
+from app.bot.routing import TextDispatchMiddleware
+from app.bot.middlewares.fsm import FsmFlushMiddleware
+from app.bot.storage import SQLAlchemyStorage, create_events_isolation, create_storage
+from app.media.analysis import TrackAnalyzer
+from app.media.covers import CoverProcessor
+from app.media.downloads import DownloadManager
+from app.media.store import BlobSweeper, FileStore
 
 
 def create_dispatcher(settings: Settings, database: Database) -> Dispatcher:
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
+    storage = create_storage(settings, database)
+    dp = Dispatcher(storage=storage, events_isolation=create_events_isolation(storage))
+    catalog = CatalogStore(
+        settings.catalog_path,
+        partial(build_catalog_view, admin_username=settings.admin_username),
+        reload_interval=settings.catalog_reload_interval,
+    )
+    dp["catalog"] = catalog
+    dp.startup.register(catalog.start)
+    dp.shutdown.register(catalog.stop)
+    dp["downloads"] = DownloadManager(
+        max_parallel=settings.max_parallel_downloads,
+        min_free_bytes=settings.min_free_disk_mb * 1024 * 1024,
+        timeout=settings.download_timeout,
+    )
+    track_store = FileStore(settings.tracks_dir, settings.file_grace_seconds)
+    cover_store = FileStore(settings.covers_dir, settings.file_grace_seconds)
+    dp["track_store"] = track_store
+    dp["cover_store"] = cover_store
+    sweeper = BlobSweeper(database.session_factory, [track_store, cover_store], interval=settings.file_sweep_interval)
+    dp.startup.register(sweeper.start)
+    dp.shutdown.register(sweeper.stop)
+    covers = CoverProcessor(
+        settings.cover_thumbnails_dir,
+        min_size=settings.cover_min_size,
+        max_workers=settings.cover_workers,
+    )
+    dp["covers"] = covers
+    dp.shutdown.register(covers.shutdown)
+    analyzer = TrackAnalyzer(database.session_factory, max_workers=settings.analysis_workers)
+    dp["analyzer"] = analyzer
+    dp.shutdown.register(analyzer.shutdown)
+    broadcasts = BroadcastEngine(
+        database.session_factory,
+        rate=settings.broadcast_rate,
+        batch_size=settings.broadcast_batch_size,
+        lease_seconds=settings.broadcast_lease_seconds,
+    )
+    dp["broadcasts"] = broadcasts
+    dp.startup.register(broadcasts.resume)
+    dp.shutdown.register(broadcasts.shutdown)
+    dp.include_router(admin.router)
     dp.include_router(menu.router)
     dp.include_router(release.router)
+    dp.message.outer_middleware(TextDispatchMiddleware.from_router(dp))
     dp.update.outer_middleware(SettingsMiddleware(settings))
-    dp.update.outer_middleware(DatabaseSessionMiddleware(database.session_factory))
+    dp.update.outer_middleware(ThrottlingMiddleware.from_settings(settings))
+    db_sessions = DatabaseSessionMiddleware(database.session_factory)
+    dp.update.outer_middleware(db_sessions)
+    if isinstance(storage, SQLAlchemyStorage):
+        dp.update.outer_middleware(FsmFlushMiddleware(storage))
+    dp.shutdown.register(db_sessions.log_stats)
+    dp.shutdown.register(_log_outbound_stats)
     return dp
 
 
+async def _log_outbound_stats(bot: Bot) -> None:
+    limiter = outbound_limiter(bot)
+    if limiter is not None:
+        limiter.log_stats()
+
+
 def create_bot(settings: Settings) -> Bot:
     bot = Bot(
         token=settings.bot_token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
+    bot.session.middleware(OutboundLimiter.from_settings(settings))
     return bot
 
 
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+from aiogram.types import ReplyKeyboardMarkup
+
+from app.bot.keyboards.main import courses_keyboard, release_services_keyboard
+from app.catalog.models import Catalog, CourseInfo, ReleaseService
+
+
+@dataclass(frozen=True)
+class CatalogView:
+    version: int
+    release_services: Tuple[ReleaseService, ...]
+    service_by_title: Mapping[str, ReleaseService]
+    release_services_text: str
+    release_services_keyboard: ReplyKeyboardMarkup
+    course_by_title: Mapping[str, CourseInfo]
+    course_texts: Mapping[str, str]
+    courses_text: str
+    courses_keyboard: ReplyKeyboardMarkup
+    ready_builds_text: str
+    custom_build_contact_text: str
+    studios_text: str
+    links_text: str
+    contact_text: str
+
+    def service(self, title: str) -> ReleaseService:
+        return self.service_by_title.get(title, self.release_services[0])
+
+
+def _release_services_text(catalog: Catalog) -> str:
+    lines = ["Выбери услугу:"]
+    for item in catalog.release_services:
+        line = f"{item.title} — {item.price}"
+        if item.note:
+            line += f" ({item.note})"
+        lines.append(line)
+    lines.append("")
+    lines.append("После загрузки материалов сформируем заявку, сохраним её в базе и подготовим черновик договора.")
+    return "\n".join(lines)
+
+
+def _ready_builds_text(catalog: Catalog) -> str:
+    lines = ["Доступные готовые сборки:"]
+    for build in catalog.ready_builds:
+        lines.append(f"• {build.title} — {build.price}")
+    lines.append("")
+    lines.append(f"Для заказа напиши @{catalog.manager}.")
+    return "\n".join(lines)
+
+
+def _courses_text(catalog: Catalog) -> str:
+    lines = ["Выбери курс:"]
+    for course in catalog.courses:
+        lines.append(f"• {course.title} — {course.price}")
+    lines.append("")
+    lines.append("После выбора откроется страница с оплатой или заявкой.")
+    return "\n".join(lines)
+
+
+def _course_selected_text(course: CourseInfo) -> str:
+    lines = [course.title]
+    lines.append(f"Стоимость: {course.price}")
+    lines.append(f"Оформить и оплатить → {course.link}")
+    lines.append("Оплата доступна через Робокассу и Telegram Stars.")
+    return "\n".join(lines)
+
+
+def _studios_text(catalog: Catalog) -> str:
+    lines = ["🎙 Наши студии по Москве:"]
+    for studio in catalog.studios:
+        lines.append("")
+        lines.append(studio.title)
+        lines.append(f"Адрес: {studio.address}")
+        lines.append(studio.description)
+        lines.append("Услуги:")
+        for service in catalog.studio_services:
+            lines.append(f"• {service.title} — {service.price}")
+    lines.append("")
+    lines.append(f"Связаться со студией → @{catalog.manager}")
+    return "\n".join(lines)
+
+
+def _links_text(catalog: Catalog) -> str:
+    lines = ["Полезные ссылки:"]
+    for link in catalog.links:
+        lines.append(f"• {link.title} → {link.url}")
+    return "\n".join(lines)
+
+
+def _contact_text(admin: str) -> str:
+    lines = ["📬 Связь с нами:"]
+    lines.append(f"Telegram: @{admin}")
+    lines.append("Подписка и оплата — через Робокассу и Telegram Stars.")
+    return "\n".join(lines)
+
+
+def build_catalog_view(catalog: Catalog, admin_username: str = "") -> CatalogView:
+    return CatalogView(
+        version=catalog.version,
+        release_services=catalog.release_services,
+        service_by_title=MappingProxyType({item.title: item for item in catalog.release_services}),
+        release_services_text=_release_services_text(catalog),
+        release_services_keyboard=release_services_keyboard(item.title for item in catalog.release_services),
+        course_by_title=MappingProxyType({course.title: course for course in catalog.courses}),
+        course_texts=MappingProxyType({course.title: _course_selected_text(course) for course in catalog.courses}),
+        courses_text=_courses_text(catalog),
+        courses_keyboard=courses_keyboard(course.title for course in catalog.courses),
+        ready_builds_text=_ready_builds_text(catalog),
+        custom_build_contact_text=f"Индивидуальную сборку поможет оформить @{catalog.custom_build_manager}.",
+        studios_text=_studios_text(catalog),
+        links_text=_links_text(catalog),
+        contact_text=_contact_text(admin_username or catalog.manager),
+    )
+
+
+__all__ = ["CatalogView", "build_catalog_view"]
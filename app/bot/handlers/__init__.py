@@ -1,4 +1,3 @@
+from . import admin, menu, release
 
-from . import menu, release
-
-__all__ = ["menu", "release"]
+__all__ = ["admin", "menu", "release"]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from aiogram import Bot, Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.broadcast import BroadcastEngine
+from app.config import Settings
+from app.database import crud
+
+router = Router()
+
+
+def is_admin(message: Message, settings: Settings) -> bool:
+    username = (message.from_user.username or "") if message.from_user else ""
+    admin = settings.admin_username.lstrip("@")
+    return bool(admin) and username.lower() == admin.lower()
+
+
+@router.message(Command("broadcast"), is_admin)
+async def cmd_broadcast(message: Message, command: CommandObject, bot: Bot, broadcasts: BroadcastEngine) -> None:
+    text = (command.args or "").strip()
+    if not text:
+        await message.answer("Использование: /broadcast <текст рассылки>")
+        return
+    campaign = await broadcasts.create(bot, text, message.from_user.id)
+    await message.answer(f"Рассылка #{campaign.id} запущена, получателей: {campaign.total}.")
+
+
+@router.message(Command("broadcast_status"), is_admin)
+async def cmd_broadcast_status(message: Message, session: AsyncSession) -> None:
+    campaign = await crud.get_latest_broadcast_campaign(session)
+    if campaign is None:
+        await message.answer("Рассылок ещё не было.")
+        return
+    await message.answer(
+        "\n".join(
+            [
+                f"Рассылка #{campaign.id}: {campaign.status}",
+                f"Отправлено: {campaign.sent} из {campaign.total}",
+                f"Заблокировали бота: {campaign.blocked}",
+                f"Ошибки: {campaign.failed}",
+            ]
+        )
+    )
+
+
+@router.message(Command("broadcast_cancel"), is_admin)
+async def cmd_broadcast_cancel(message: Message, command: CommandObject, broadcasts: BroadcastEngine) -> None:
+    if not command.args or not command.args.strip().isdigit():
+        await message.answer("Использование: /broadcast_cancel <номер рассылки>")
+        return
+    campaign_id = int(command.args.strip())
+    if await broadcasts.cancel(campaign_id):
+        await message.answer(f"Рассылка #{campaign_id} остановлена.")
+    else:
+        await message.answer(f"Рассылка #{campaign_id} не найдена или уже завершена.")
@@ -1,92 +1,61 @@
 from __future__ import annotations
 
+import asyncio
 import re
-from dataclasses import dataclass
+from dataclasses import asdict
 from pathlib import Path
+from typing import Optional
 
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
-from PIL import Image
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.catalog import CatalogStore, ReleaseService
 from app.config import Settings
-from app.database import crud
+from app.database import crud, models
 from app.logging import logger
-from app.utils.files import ensure_parent, sanitize_filename
-from app.bot.keyboards.main import BACK_BUTTON, back_keyboard, main_menu, release_services_keyboard
+from app.media.analysis import TrackAnalyzer
+from app.media.audio import AudioInfo, AudioProbeError, probe_audio
+from app.media.covers import CoverInfo, CoverProcessor, CoverRejected
+from app.media.downloads import DownloadManager, DownloadTooLarge, InsufficientDiskSpace
+from app.media.store import FileStore
+from app.bot.keyboards.main import BACK_BUTTON, back_keyboard, main_menu
 from app.bot.states import ReleaseStates
 
 router = Router()
 
 MAX_TRACK_SIZE = 100 * 1024 * 1024
+MAX_COVER_SIZE = 20 * 1024 * 1024
 ALLOWED_TRACK_EXT = {".wav", ".mp3"}
 ALLOWED_COVER_EXT = {".jpg", ".jpeg", ".png"}
 EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
 
-@dataclass(frozen=True)
-class ReleaseService:
-    title: str
-    price: str
-    note: str
+def release_services_text(catalog: CatalogStore) -> str:
+    return catalog.view.release_services_text
 
 
-RELEASE_SERVICES = (
-    ReleaseService("1 релиз", "555 ₽", "без питчинга"),
-    ReleaseService("1 релиз + питчинг", "1111 ₽", "включает продвижение"),
-    ReleaseService("ЕР + питчинг", "3333 ₽", "мини-альбом"),
-    ReleaseService("Альбом (питчинг в подарок)", "5555 ₽", "полный релиз"),
-    ReleaseService("Годовая подписка", "11111 ₽", "безлимитное количество релизов"),
-    ReleaseService("Питчинг отдельно", "555 ₽", "по запросу"),
-    ReleaseService("Отправка инвестору", "1111 ₽", "вручную или автоматически"),
-    ReleaseService("Отправка на радио", "2222 ₽", "по списку радиостанций"),
-    ReleaseService("Консультация с главой лейбла", "11111 ₽", "1 час онлайн"),
-)
+def release_services_markup(catalog: CatalogStore):
+    return catalog.view.release_services_keyboard
 
-SERVICE_BY_TITLE = {item.title: item for item in RELEASE_SERVICES}
-SERVICE_TITLES = [item.title for item in RELEASE_SERVICES]
 
-
-def release_services_text() -> str:
-    lines = ["Выбери услугу:"]
-    for item in RELEASE_SERVICES:
-        line = f"{item.title} — {item.price}"
-        if item.note:
-            line += f" ({item.note})"
-        lines.append(line)
-    lines.append("")
-    lines.append("После загрузки материалов сформируем заявку, сохраним её в базе и подготовим черновик договора.")
-    return "\n".join(lines)
-
-
-def release_services_markup():
-    return release_services_keyboard(SERVICE_TITLES)
-
-
-async def prompt_release_services(message: Message, state: FSMContext) -> None:
+async def prompt_release_services(message: Message, state: FSMContext, catalog: CatalogStore) -> None:
+    view = catalog.view
     await state.set_state(ReleaseStates.service)
-    await message.answer(release_services_text(), reply_markup=release_services_markup())
-
-
-async def _download_file(message: Message, file_id: str, destination: Path) -> None:
-    ensure_parent(destination)
-    file = await message.bot.get_file(file_id)
-    await message.bot.download_file(file.file_path, destination=str(destination))
+    await message.answer(view.release_services_text, reply_markup=view.release_services_keyboard)
 
 
-def _validate_cover(path: Path) -> None:
-    with Image.open(path) as img:
-        img.verify()
-
-
-def _service_from_state(data: dict) -> ReleaseService:
+def _service_from_state(data: dict, catalog: CatalogStore) -> ReleaseService:
+    # The price is remembered at selection time so a catalog update mid-flow
+    # does not change what the user agreed to.
     title = data.get("service")
-    return SERVICE_BY_TITLE.get(title, RELEASE_SERVICES[0])
+    if "service_price" in data:
+        return ReleaseService(title, data["service_price"], data.get("service_note", ""))
+    return catalog.view.service(title)
 
 
-def _build_description(data: dict) -> str:
-    service = _service_from_state(data)
+def _build_description(data: dict, service: ReleaseService) -> str:
     first_line = f"Услуга: {service.title} — {service.price}"
     if service.note:
         first_line += f" ({service.note})"
@@ -99,9 +68,37 @@ def _build_description(data: dict) -> str:
     original_track = data.get("track_original_name")
     if original_track:
         parts.append(f"Исходное имя файла: {original_track}")
+    track_info = data.get("track_info")
+    if track_info:
+        parts.append(f"Аудио: {_describe_audio(track_info)}")
     return "\n".join(parts)
 
 
+def _describe_audio(info: dict) -> str:
+    minutes, seconds = divmod(int(round(info["duration"])), 60)
+    details = [info["format"].upper()]
+    if info.get("bit_depth"):
+        details.append(f"{info['bit_depth']} бит")
+    else:
+        details.append(f"{info['bitrate'] // 1000} кбит/с")
+    details.append(f"{info['sample_rate']} Гц")
+    details.append("моно" if info["channels"] == 1 else f"{info['channels']} кан.")
+    details.append(f"{minutes}:{seconds:02d}")
+    return ", ".join(details)
+
+
+async def _known_upload(session: AsyncSession, store: FileStore, file_unique_id: str) -> Optional[models.TelegramFile]:
+    record = await crud.get_telegram_file(session, file_unique_id)
+    if record is None:
+        return None
+    # Rows written before the content-addressed store, or under another root, are not trusted.
+    path = Path(record.path)
+    if not store.owns(path) or not store.reuse(path):
+        await crud.delete_telegram_files(session, record.path)
+        return None
+    return record
+
+
 @router.message(ReleaseStates.service, F.text == BACK_BUTTON)
 async def release_back_to_menu(message: Message, state: FSMContext) -> None:
     await state.clear()
@@ -109,12 +106,13 @@ async def release_back_to_menu(message: Message, state: FSMContext) -> None:
 
 
 @router.message(ReleaseStates.service)
-async def select_release_service(message: Message, state: FSMContext) -> None:
-    service = SERVICE_BY_TITLE.get(message.text or "")
+async def select_release_service(message: Message, state: FSMContext, catalog: CatalogStore) -> None:
+    view = catalog.view
+    service = view.service_by_title.get(message.text or "")
     if not service:
-        await message.answer("Выбери услугу из списка ниже.", reply_markup=release_services_markup())
+        await message.answer("Выбери услугу из списка ниже.", reply_markup=view.release_services_keyboard)
         return
-    await state.update_data(service=service.title)
+    await state.update_data(service=service.title, service_price=service.price, service_note=service.note)
     await state.set_state(ReleaseStates.track_upload)
     await message.answer(
         "Загрузи трек файлом WAV или MP3 (до 100 МБ).",
@@ -123,12 +121,19 @@ async def select_release_service(message: Message, state: FSMContext) -> None:
 
 
 @router.message(ReleaseStates.track_upload, F.text == BACK_BUTTON)
-async def release_track_back(message: Message, state: FSMContext) -> None:
-    await prompt_release_services(message, state)
+async def release_track_back(message: Message, state: FSMContext, catalog: CatalogStore) -> None:
+    await prompt_release_services(message, state, catalog)
 
 
 @router.message(ReleaseStates.track_upload, F.document | F.audio)
-async def handle_track_upload(message: Message, state: FSMContext, settings: Settings) -> None:
+async def handle_track_upload(
+    message: Message,
+    state: FSMContext,
+    settings: Settings,
+    session: AsyncSession,
+    downloads: DownloadManager,
+    track_store: FileStore,
+) -> None:
     file = message.document or message.audio
     if not file:
         await message.answer("Отправь трек как файл WAV или MP3.", reply_markup=back_keyboard())
@@ -142,17 +147,67 @@ async def handle_track_upload(message: Message, state: FSMContext, settings: Set
     if size > MAX_TRACK_SIZE:
         await message.answer("Файл должен быть не более 100 МБ.", reply_markup=back_keyboard())
         return
-    sanitized_name = sanitize_filename(filename)
-    destination = settings.tracks_dir / sanitized_name
+    known = await _known_upload(session, track_store, file.file_unique_id)
+    if known is not None:
+        try:
+            info = await asyncio.to_thread(probe_audio, Path(known.path), ext)
+        except AudioProbeError as exc:
+            logger.info("Track rejected: %s", exc)
+            await _reject_track(message)
+            return
+        await state.update_data(
+            track_file=known.path,
+            track_sha256=known.sha256,
+            track_original_name=filename,
+            track_info=asdict(info),
+        )
+        await _prompt_cover(message, state, settings)
+        return
+    staged = track_store.staging_path(ext)
     try:
-        await _download_file(message, file.file_id, destination)
+        result = await downloads.download(message.bot, file.file_id, staged, MAX_TRACK_SIZE, declared_size=size)
+        info = await asyncio.to_thread(probe_audio, staged, ext)
+    except AudioProbeError as exc:
+        logger.info("Track rejected: %s", exc)
+        staged.unlink(missing_ok=True)
+        await _reject_track(message)
+        return
+    except DownloadTooLarge:
+        await message.answer("Файл должен быть не более 100 МБ.", reply_markup=back_keyboard())
+        return
+    except InsufficientDiskSpace:
+        logger.warning("Rejecting track upload: not enough disk space")
+        await message.answer("Сервер сейчас перегружен. Попробуй отправить трек через несколько минут.", reply_markup=back_keyboard())
+        return
     except Exception as exc:
         logger.error("Track download failed: %s", exc)
+        staged.unlink(missing_ok=True)
         await message.answer("Не удалось скачать файл. Попробуй ещё раз.", reply_markup=back_keyboard())
         return
-    await state.update_data(track_file=str(destination), track_original_name=filename)
+    track_path = track_store.publish(result.path, result.sha256, ext)
+    await crud.save_telegram_file(session, file.file_unique_id, str(track_path), result.sha256, result.size)
+    await state.update_data(
+        track_file=str(track_path),
+        track_sha256=result.sha256,
+        track_original_name=filename,
+        track_info=asdict(info),
+    )
+    await _prompt_cover(message, state, settings)
+
+
+async def _reject_track(message: Message) -> None:
+    await message.answer(
+        "Файл повреждён или не соответствует расширению. Нужен настоящий WAV (PCM) или MP3.",
+        reply_markup=back_keyboard(),
+    )
+
+
+async def _prompt_cover(message: Message, state: FSMContext, settings: Settings) -> None:
     await state.set_state(ReleaseStates.cover_upload)
-    await message.answer("Теперь пришли обложку JPG или PNG.", reply_markup=back_keyboard())
+    await message.answer(
+        f"Теперь пришли обложку JPG или PNG файлом: квадрат не меньше {settings.cover_min_size}×{settings.cover_min_size}.",
+        reply_markup=back_keyboard(),
+    )
 
 
 @router.message(ReleaseStates.track_upload)
@@ -167,12 +222,20 @@ async def release_cover_back(message: Message, state: FSMContext) -> None:
 
 
 @router.message(ReleaseStates.cover_upload, F.photo | F.document)
-async def handle_cover_upload(message: Message, state: FSMContext, settings: Settings) -> None:
+async def handle_cover_upload(
+    message: Message,
+    state: FSMContext,
+    downloads: DownloadManager,
+    covers: CoverProcessor,
+    cover_store: FileStore,
+    session: AsyncSession,
+) -> None:
     if message.photo:
         photo = message.photo[-1]
-        filename = f"cover_{message.from_user.id}_{photo.file_unique_id}.jpg"
-        destination = settings.covers_dir / sanitize_filename(filename)
+        ext = ".jpg"
         file_id = photo.file_id
+        file_unique_id = photo.file_unique_id
+        size = photo.file_size
     else:
         document = message.document
         if not document:
@@ -183,16 +246,61 @@ async def handle_cover_upload(message: Message, state: FSMContext, settings: Set
         if ext not in ALLOWED_COVER_EXT:
             await message.answer("Допустимы только JPG или PNG.", reply_markup=back_keyboard())
             return
-        destination = settings.covers_dir / sanitize_filename(filename)
         file_id = document.file_id
-    try:
-        await _download_file(message, file_id, destination)
-        _validate_cover(destination)
-    except Exception as exc:
-        logger.error("Cover processing failed: %s", exc)
-        await message.answer("Не удалось обработать обложку. Проверь файл и попробуй снова.", reply_markup=back_keyboard())
+        file_unique_id = document.file_unique_id
+        size = document.file_size
+    known = await _known_upload(session, cover_store, file_unique_id)
+    if known is not None:
+        try:
+            cover = await covers.process(Path(known.path), key=known.sha256)
+        except CoverRejected as exc:
+            logger.info("Cover rejected: %s", exc)
+            await _reject_cover(message, covers)
+            return
+        except Exception as exc:
+            logger.error("Cover processing failed: %s", exc)
+            await message.answer("Не удалось обработать обложку. Проверь файл и попробуй снова.", reply_markup=back_keyboard())
+            return
+        await _accept_cover(message, state, known.path, cover)
         return
-    await state.update_data(cover_file=str(destination))
+    staged = cover_store.staging_path(ext)
+    try:
+        try:
+            result = await downloads.download(message.bot, file_id, staged, MAX_COVER_SIZE, declared_size=size)
+            cover = await covers.process(staged, key=result.sha256)
+        except CoverRejected as exc:
+            logger.info("Cover rejected: %s", exc)
+            await _reject_cover(message, covers)
+            return
+        except DownloadTooLarge:
+            await message.answer("Обложка должна быть не более 20 МБ.", reply_markup=back_keyboard())
+            return
+        except InsufficientDiskSpace:
+            logger.warning("Rejecting cover upload: not enough disk space")
+            await message.answer("Сервер сейчас перегружен. Попробуй отправить обложку через несколько минут.", reply_markup=back_keyboard())
+            return
+        except Exception as exc:
+            logger.error("Cover processing failed: %s", exc)
+            await message.answer("Не удалось обработать обложку. Проверь файл и попробуй снова.", reply_markup=back_keyboard())
+            return
+        cover_path = cover_store.publish(staged, result.sha256, ext)
+    finally:
+        # publish() moves the staged file away; anything left here is a rejected upload.
+        staged.unlink(missing_ok=True)
+    await crud.save_telegram_file(session, file_unique_id, str(cover_path), result.sha256, result.size)
+    await _accept_cover(message, state, str(cover_path), cover)
+
+
+async def _reject_cover(message: Message, covers: CoverProcessor) -> None:
+    await message.answer(
+        f"Обложка должна быть квадратной, не меньше {covers.min_size}×{covers.min_size} пикселей, в формате JPG или PNG. "
+        "Отправь её файлом, чтобы Telegram не сжал изображение.",
+        reply_markup=back_keyboard(),
+    )
+
+
+async def _accept_cover(message: Message, state: FSMContext, cover_path: str, cover: CoverInfo) -> None:
+    await state.update_data(cover_file=cover_path, cover_thumbnail=cover.thumbnail)
     await state.set_state(ReleaseStates.artist_name)
     await message.answer("Укажи имя артиста.", reply_markup=back_keyboard())
 
@@ -273,22 +381,44 @@ async def release_email_back(message: Message, state: FSMContext) -> None:
 
 
 @router.message(ReleaseStates.contact_email)
-async def handle_contact_email(message: Message, state: FSMContext, settings: Settings, session: AsyncSession) -> None:
+async def handle_contact_email(
+    message: Message,
+    state: FSMContext,
+    settings: Settings,
+    session: AsyncSession,
+    analyzer: TrackAnalyzer,
+    catalog: CatalogStore,
+    track_store: FileStore,
+    cover_store: FileStore,
+) -> None:
     email = (message.text or "").strip()
     if not EMAIL_RE.match(email):
         await message.answer("Похоже на неверный e-mail. Попробуй снова.", reply_markup=back_keyboard())
         return
     await state.update_data(contact_email=email)
-    await finalize_release(message, state, settings, session)
-
-
-async def finalize_release(message: Message, state: FSMContext, settings: Settings, session: AsyncSession) -> None:
+    await finalize_release(message, state, settings, session, analyzer, catalog, track_store, cover_store)
+
+
+async def finalize_release(
+    message: Message,
+    state: FSMContext,
+    settings: Settings,
+    session: AsyncSession,
+    analyzer: TrackAnalyzer,
+    catalog: CatalogStore,
+    track_store: FileStore,
+    cover_store: FileStore,
+) -> None:
     data = await state.get_data()
     track_path = data.get("track_file")
     cover_path = data.get("cover_file")
-    if not track_path or not cover_path:
+    # A flow paused for longer than the grace period may have lost its uploads to the sweep;
+    # reuse() also refreshes them until the release row is committed.
+    if not (track_path and track_store.reuse(Path(track_path))) or not (
+        cover_path and cover_store.reuse(Path(cover_path))
+    ):
         await message.answer("Не хватает файлов для заявки. Начнём заново.", reply_markup=back_keyboard())
-        await prompt_release_services(message, state)
+        await prompt_release_services(message, state, catalog)
         return
     user = await crud.get_or_create_user(
         session,
@@ -297,18 +427,23 @@ async def finalize_release(message: Message, state: FSMContext, settings: Settin
         first_name=message.from_user.first_name,
         last_name=message.from_user.last_name,
     )
-    service = _service_from_state(data)
+    service = _service_from_state(data, catalog)
     release = await crud.create_release(
         session,
         user=user,
         track_name=data.get("release_title", "Без названия"),
         artist=data.get("artist_name"),
         authors=data.get("genre"),
-        description=_build_description(data),
+        description=_build_description(data, service),
         release_date=service.title,
         track_file=track_path,
         cover_file=cover_path,
     )
+    track_info = data.get("track_info")
+    if track_info:
+        # The analyzer writes from its own session, so the release must be visible first.
+        await session.commit()
+        analyzer.schedule(release.id, Path(track_path), AudioInfo(**track_info))
     await state.clear()
     summary_lines = [
         "Заявка отправлена!",
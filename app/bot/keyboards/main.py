@@ -4,24 +4,38 @@ from aiogram.types import KeyboardButton, ReplyKeyboardMarkup
 
 BACK_BUTTON = "↩️ Назад"
 
+# Static keyboards are built once and shared; aiogram only serializes them on send.
+_MAIN_MENU = ReplyKeyboardMarkup(
+    keyboard=[
+        [KeyboardButton(text="🎵 Музыка и релизы")],
+        [KeyboardButton(text="💻 Собрать ПК"), KeyboardButton(text="🎙 Наши студии")],
+        [KeyboardButton(text="📚 Курсы и обучение"), KeyboardButton(text="🔗 Полезные ссылки")],
+        [KeyboardButton(text="📬 Связь с нами")],
+    ],
+    resize_keyboard=True,
+)
+
+_BACK_KEYBOARD = ReplyKeyboardMarkup(
+    keyboard=[[KeyboardButton(text=BACK_BUTTON)]],
+    resize_keyboard=True,
+)
+
+_PC_MODES_KEYBOARD = ReplyKeyboardMarkup(
+    keyboard=[
+        [KeyboardButton(text="Готовые сборки")],
+        [KeyboardButton(text="Индивидуальная сборка")],
+        [KeyboardButton(text=BACK_BUTTON)],
+    ],
+    resize_keyboard=True,
+)
+
 
 def main_menu() -> ReplyKeyboardMarkup:
-    return ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text="🎵 Музыка и релизы")],
-            [KeyboardButton(text="💻 Собрать ПК"), KeyboardButton(text="🎙 Наши студии")],
-            [KeyboardButton(text="📚 Курсы и обучение"), KeyboardButton(text="🔗 Полезные ссылки")],
-            [KeyboardButton(text="📬 Связь с нами")],
-        ],
-        resize_keyboard=True,
-    )
+    return _MAIN_MENU
 
 
 def back_keyboard() -> ReplyKeyboardMarkup:
-    return ReplyKeyboardMarkup(
-        keyboard=[[KeyboardButton(text=BACK_BUTTON)]],
-        resize_keyboard=True,
-    )
+    return _BACK_KEYBOARD
 
 
 def release_services_keyboard(options: Iterable[str]) -> ReplyKeyboardMarkup:
@@ -31,14 +45,7 @@ def release_services_keyboard(options: Iterable[str]) -> ReplyKeyboardMarkup:
 
 
 def pc_modes_keyboard() -> ReplyKeyboardMarkup:
-    return ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text="Готовые сборки")],
-            [KeyboardButton(text="Индивидуальная сборка")],
-            [KeyboardButton(text=BACK_BUTTON)],
-        ],
-        resize_keyboard=True,
-    )
+    return _PC_MODES_KEYBOARD
 
 
 def courses_keyboard(options: Iterable[str]) -> ReplyKeyboardMarkup:
@@ -1,5 +1,6 @@
 
-from .db import DatabaseSessionMiddleware
+from .db import DatabaseSessionMiddleware, LazySession
 from .settings import SettingsMiddleware
+from .throttling import ThrottlingMiddleware
 
-__all__ = ["DatabaseSessionMiddleware", "SettingsMiddleware"]
+__all__ = ["DatabaseSessionMiddleware", "LazySession", "SettingsMiddleware", "ThrottlingMiddleware"]
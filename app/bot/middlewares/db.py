@@ -1,23 +1,89 @@
 from __future__ import annotations
 
-from typing import Any, Awaitable, Callable, Dict
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from aiogram import BaseMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.logging import logger
+
+
+class LazySession:
+    __slots__ = ("_factory", "_session", "_touched")
+
+    def __init__(self, session_factory):
+        self._factory = session_factory
+        self._session: Optional[AsyncSession] = None
+        self._touched = False
+
+    @property
+    def touched(self) -> bool:
+        # Whether SQL ran or is waiting for the commit; creating the session or reading an
+        # attribute off it (an identity-map get, say) does not count.
+        return self._touched or self.has_work()
+
+    def __getattr__(self, name: str) -> Any:
+        session = self._session
+        if session is None:
+            session = self._session = self._factory()
+        return getattr(session, name)
+
+    def has_work(self) -> bool:
+        session = self._session
+        if session is None:
+            return False
+        return session.in_transaction() or bool(session.new or session.dirty or session.deleted)
+
+    async def commit(self) -> None:
+        if self.has_work():
+            self._touched = True
+            await self._session.commit()
+
+    async def rollback(self) -> None:
+        if self.has_work():
+            self._touched = True
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
 
 class DatabaseSessionMiddleware(BaseMiddleware):
     def __init__(self, session_factory):
         super().__init__()
         self._session_factory = session_factory
+        self.updates_total = 0
+        self.updates_with_db = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"updates": self.updates_total, "with_db": self.updates_with_db}
+
+    def log_stats(self) -> None:
+        logger.info(
+            "Database sessions: %s of %s updates touched the database",
+            self.updates_with_db,
+            self.updates_total,
+        )
 
     async def __call__(self, handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]], event: Any, data: Dict[str, Any]) -> Any:
-        async with self._session_factory() as session:                      
-            data["session"] = session
-            try:
-                result = await handler(event, data)
-                await session.commit()
-                return result
-            except Exception:
-                await session.rollback()
-                raise
+        # Handlers get a proxy; the real session (and a pool connection) is only
+        # created once a handler actually touches it.
+        session = LazySession(self._session_factory)
+        data["session"] = session
+        self.updates_total += 1
+        try:
+            result = await handler(event, data)
+            await session.commit()
+            return result
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            if session.touched:
+                self.updates_with_db += 1
+            await session.close()
+
+
+__all__ = ["DatabaseSessionMiddleware", "LazySession"]
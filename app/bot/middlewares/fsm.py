@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+
+from app.bot.storage.sql import SQLAlchemyStorage
+
+
+class FsmFlushMiddleware(BaseMiddleware):
+    # Commits the FSM writes of an update once its handler has returned, so the next update,
+    # in whichever bot process, sees them and a crash after the reply cannot lose them.
+    def __init__(self, storage: SQLAlchemyStorage):
+        super().__init__()
+        self._storage = storage
+
+    async def __call__(self, handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]], event: Any, data: Dict[str, Any]) -> Any:
+        try:
+            return await handler(event, data)
+        finally:
+            await self._storage.flush()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import Update
+
+from app.config import Settings
+from app.logging import logger
+from app.utils.ratelimit import BucketMap, TokenBucket
+
+TEXT = "text"
+MEDIA = "media"
+MEDIA_FIELDS = ("document", "audio", "photo", "video", "voice", "video_note", "animation")
+THROTTLED_TEXT = "Слишком много запросов. Подожди несколько секунд и попробуй снова."
+
+
+@dataclass(slots=True)
+class Limit:
+    rate: float
+    burst: float
+
+
+def update_kind(update: Any) -> str:
+    message = getattr(update, "message", None) if isinstance(update, Update) else None
+    if message is not None and any(getattr(message, name) for name in MEDIA_FIELDS):
+        return MEDIA
+    return TEXT
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    def __init__(
+        self,
+        per_user: Dict[str, Limit],
+        overall: Dict[str, Limit],
+        max_users: int = 10000,
+        notice_cooldown: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self._clock = clock
+        self._users = {
+            kind: BucketMap(limit.rate, limit.burst, max_entries=max_users, clock=clock)
+            for kind, limit in per_user.items()
+        }
+        now = clock()
+        self._overall = {kind: TokenBucket(limit.rate, limit.burst, now) for kind, limit in overall.items()}
+        # One token per cooldown: the rejection notice is sent at most once per window.
+        self._notices: BucketMap[int] = BucketMap(1.0 / notice_cooldown, 1.0, max_entries=max_users, clock=clock)
+        self.rejected = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ThrottlingMiddleware":
+        return cls(
+            per_user={
+                TEXT: Limit(settings.throttle_text_rate, settings.throttle_text_burst),
+                MEDIA: Limit(settings.throttle_media_rate, settings.throttle_media_burst),
+            },
+            overall={
+                TEXT: Limit(settings.throttle_global_text_rate, settings.throttle_global_text_burst),
+                MEDIA: Limit(settings.throttle_global_media_rate, settings.throttle_global_media_burst),
+            },
+            max_users=settings.throttle_max_users,
+            notice_cooldown=settings.throttle_notice_cooldown,
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "rejected": self.rejected,
+            "tracked_users": max((len(buckets) for buckets in self._users.values()), default=0),
+        }
+
+    async def __call__(self, handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]], event: Any, data: Dict[str, Any]) -> Any:
+        kind = update_kind(event)
+        now = self._clock()
+        user = data.get("event_from_user")
+        user_bucket = None
+        if user is not None and kind in self._users:
+            user_bucket = self._users[kind].get(user.id, now)
+            if not user_bucket.peek(now):
+                return await self._reject(data, kind, "user")
+        overall = self._overall.get(kind)
+        if overall is not None and not overall.consume(now):
+            return await self._reject(data, kind, "global")
+        if user_bucket is not None:
+            user_bucket.consume(now)
+        return await handler(event, data)
+
+    async def _reject(self, data: Dict[str, Any], kind: str, scope: str) -> None:
+        self.rejected += 1
+        user = data.get("event_from_user")
+        chat = data.get("event_chat")
+        logger.debug("Throttled %s update from %s (%s limit)", kind, user.id if user else None, scope)
+        if user is None or chat is None or not self._notices.consume(user.id):
+            return None
+        try:
+            await data["bot"].send_message(chat.id, THROTTLED_TEXT)
+        except TelegramAPIError as exc:
+            logger.warning("Failed to send throttling notice to %s: %s", chat.id, exc)
+        return None
+
+
+__all__ = ["Limit", "ThrottlingMiddleware", "update_kind"]
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+
+from app.config import Settings
+from app.logging import logger
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+ChatId = Union[int, str]
+
+LIMITED_METHOD_PREFIXES = ("Send", "Copy", "Forward", "Edit")
+
+
+class _Pacer:
+    # GCRA: a call may start once the theoretical arrival time minus the burst
+    # allowance has passed; reservations are handed out in call order.
+    __slots__ = ("interval", "allowance", "tat", "paused_until")
+
+    def __init__(self, rate: float, burst: int):
+        self.interval = 1.0 / rate
+        self.allowance = (burst - 1) * self.interval
+        self.tat = 0.0
+        self.paused_until = 0.0
+
+    def reserve(self, now: float) -> float:
+        start = max(now, self.tat - self.allowance, self.paused_until)
+        self.tat = max(self.tat, start) + self.interval
+        return start - now
+
+    def idle(self, now: float) -> bool:
+        return self.tat <= now and self.paused_until <= now
+
+
+class OutboundLimiter(BaseRequestMiddleware):
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        chat_burst: int = 3,
+        max_retries: int = 3,
+        max_chats: int = 10000,
+    ):
+        self._global = _Pacer(global_rate, max(1, int(global_rate)))
+        self._chat_rate = chat_rate
+        self._group_rate = group_rate
+        self._chat_burst = chat_burst
+        self._max_chats = max_chats
+        self._chats: "OrderedDict[ChatId, _Pacer]" = OrderedDict()
+        self.max_retries = max_retries
+        self.queued = 0
+        self.sent = 0
+        self.retries = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "OutboundLimiter":
+        return cls(
+            global_rate=settings.outbound_global_rate,
+            chat_rate=settings.outbound_chat_rate,
+            group_rate=settings.outbound_group_rate,
+            chat_burst=settings.outbound_chat_burst,
+            max_retries=settings.outbound_max_retries,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "sent": self.sent,
+            "retries": self.retries,
+            "wait_avg_ms": round(self.wait_total / self.waits * 1000, 1) if self.waits else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 1),
+            "paused_chats": sum(1 for pacer in self._chats.values() if pacer.paused_until > self._now()),
+        }
+
+    def log_stats(self) -> None:
+        logger.info("Outbound Telegram calls: %s", self.stats())
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None or not type(method).__name__.startswith(LIMITED_METHOD_PREFIXES):
+            return await make_request(bot, method)
+        attempt = 0
+        while True:
+            await self._wait_turn(chat_id)
+            try:
+                response = await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self.retries += 1
+                self._chat(chat_id).paused_until = self._now() + exc.retry_after
+                logger.warning("Telegram asked to slow down in chat %s for %ss", chat_id, exc.retry_after)
+                continue
+            self.sent += 1
+            return response
+
+    async def _wait_turn(self, chat_id: ChatId) -> None:
+        started = self._now()
+        self.queued += 1
+        try:
+            pacer = self._chat(chat_id)
+            delay = pacer.reserve(started)
+            while delay > 0:
+                await asyncio.sleep(delay)
+                # A Retry-After may have arrived while we were waiting for our slot.
+                delay = pacer.paused_until - self._now()
+            delay = self._global.reserve(self._now())
+            if delay > 0:
+                await asyncio.sleep(delay)
+        finally:
+            self.queued -= 1
+        waited = self._now() - started
+        self.waits += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    def _chat(self, chat_id: ChatId) -> _Pacer:
+        pacer = self._chats.get(chat_id)
+        if pacer is not None:
+            self._chats.move_to_end(chat_id)
+            return pacer
+        if len(self._chats) >= self._max_chats:
+            self._evict(self._now())
+        is_group = isinstance(chat_id, str) or chat_id < 0
+        pacer = self._chats[chat_id] = _Pacer(self._group_rate if is_group else self._chat_rate, self._chat_burst)
+        return pacer
+
+    def _evict(self, now: float) -> None:
+        # Idle pacers hold nothing a fresh one would not, so every one of them goes. Only if
+        # that frees no room are the least recently used chats dropped while still pacing.
+        for chat_id in [chat_id for chat_id, pacer in self._chats.items() if pacer.idle(now)]:
+            del self._chats[chat_id]
+        while len(self._chats) >= self._max_chats:
+            self._chats.popitem(last=False)
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+
+def outbound_limiter(bot: "Bot") -> Optional[OutboundLimiter]:
+    for middleware in bot.session.middleware:
+        if isinstance(middleware, OutboundLimiter):
+            return middleware
+    return None
+
+
+__all__ = ["OutboundLimiter", "outbound_limiter"]
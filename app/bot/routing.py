@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import operator
+from dataclasses import dataclass
+from inspect import isclass
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+from aiogram import BaseMiddleware, Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import FilterObject, HandlerObject
+from aiogram.filters import Command
+from aiogram.filters.state import StateFilter
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import Message
+from magic_filter.operations import ComparatorOperation, GetAttributeOperation
+
+from app.logging import logger
+
+# Static verdicts for a filter against a known (state, text) pair.
+_NO, _YES, _MAYBE = 0, 1, 2
+
+ANY_STATE = "*"
+# Stands for every FSM state no handler mentions explicitly.
+_OTHER_STATE = "\x00other"
+
+Predicate = Callable[[Optional[str], str], int]
+
+
+@dataclass(frozen=True)
+class Route:
+    router: Router
+    handler: HandlerObject
+
+
+@dataclass(frozen=True)
+class _Entry:
+    routes: Tuple[Route, ...]
+    complete: bool
+
+
+def _state_names(value: Any) -> Optional[FrozenSet[Optional[str]]]:
+    if value is None or isinstance(value, str):
+        return frozenset([value])
+    if isinstance(value, State):
+        return frozenset([value.state])
+    if isinstance(value, StatesGroup):
+        value = type(value)
+    if isclass(value) and issubclass(value, StatesGroup):
+        return frozenset(value.__all_states_names__)
+    return None
+
+
+def _state_predicate(allowed: FrozenSet[Optional[str]]) -> Predicate:
+    if ANY_STATE in allowed:
+        return lambda state, text: _YES
+    return lambda state, text: _YES if state in allowed else _NO
+
+
+def _exact_text(filter_object: FilterObject) -> Optional[str]:
+    magic = getattr(filter_object, "magic", None)
+    if magic is None:
+        return None
+    operations = magic._operations
+    if len(operations) != 2:
+        return None
+    attribute, comparison = operations
+    if not isinstance(attribute, GetAttributeOperation) or attribute.name != "text":
+        return None
+    if not isinstance(comparison, ComparatorOperation) or comparison.comparator is not operator.eq:
+        return None
+    return comparison.right if isinstance(comparison.right, str) else None
+
+
+def _predicate(filter_object: FilterObject, texts: Set[str], states: Set[Optional[str]]) -> Predicate:
+    callback = filter_object.callback
+    text = _exact_text(filter_object)
+    if text is not None:
+        texts.add(text)
+        return lambda state, candidate: _YES if candidate == text else _NO
+    allowed = _state_names(callback)
+    if allowed is None and isinstance(callback, StateFilter):
+        names = [_state_names(value) for value in callback.states]
+        if all(name is not None for name in names):
+            allowed = frozenset().union(*names)
+    if allowed is not None:
+        states.update(allowed)
+        return _state_predicate(allowed)
+    if isinstance(callback, Command):
+        prefixes = tuple(callback.prefix)
+        return lambda state, candidate: _MAYBE if candidate.startswith(prefixes) else _NO
+    return lambda state, candidate: _MAYBE
+
+
+def _iter_routers(router: Router) -> Iterator[Router]:
+    yield router
+    for sub_router in router.sub_routers:
+        yield from _iter_routers(sub_router)
+
+
+# Resolves reply-keyboard clicks with one lookup by (FSM state, exact text). The table only
+# holds pairs for which the regular filter chain is statically known to pick the same handler;
+# anything else falls through to aiogram. Install it as the last message outer middleware of
+# the root router, after every sub-router has been included.
+class TextDispatchMiddleware(BaseMiddleware):
+    def __init__(self, table: Dict[Tuple[Optional[str], str], _Entry], states: Set[Optional[str]]):
+        super().__init__()
+        self._table = table
+        self._states = frozenset(states)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_router(cls, root: Router) -> "TextDispatchMiddleware":
+        texts: Set[str] = set()
+        states: Set[Optional[str]] = {None}
+        chain: List[Tuple[Route, List[Predicate]]] = []
+        for router in _iter_routers(root):
+            observer = router.message
+            # Root filters and nested outer middlewares would be bypassed by a direct call.
+            opaque = bool(observer._handler.filters) or (router is not root and bool(observer.outer_middleware))
+            for handler in observer.handlers:
+                predicates = [_predicate(item, texts, states) for item in handler.filters or ()]
+                if opaque:
+                    predicates.append(lambda state, text: _MAYBE)
+                chain.append((Route(router, handler), predicates))
+        states.discard(ANY_STATE)
+
+        table: Dict[Tuple[Optional[str], str], _Entry] = {}
+        for state in (*states, _OTHER_STATE):
+            for text in texts:
+                entry = cls._resolve(chain, state, text)
+                if entry is not None:
+                    table[(state, text)] = entry
+        logger.debug("Text dispatch table: %s entries for %s texts", len(table), len(texts))
+        return cls(table, states)
+
+    @staticmethod
+    def _resolve(chain: List[Tuple[Route, List[Predicate]]], state: Optional[str], text: str) -> Optional[_Entry]:
+        routes: List[Route] = []
+        for route, predicates in chain:
+            verdicts = [predicate(state, text) for predicate in predicates]
+            if _NO in verdicts:
+                continue
+            if _MAYBE in verdicts:
+                return _Entry(tuple(routes), complete=False) if routes else None
+            routes.append(route)
+        return _Entry(tuple(routes), complete=True) if routes else None
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._table), "hits": self.hits, "misses": self.misses}
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: Dict[str, Any],
+    ) -> Any:
+        entry = None
+        if isinstance(event, Message) and event.text is not None:
+            state = data.get("raw_state")
+            if state not in self._states:
+                state = _OTHER_STATE
+            entry = self._table.get((state, event.text))
+        if entry is None:
+            self.misses += 1
+            return await handler(event, data)
+        self.hits += 1
+        for route in entry.routes:
+            try:
+                return await self._call(route, event, data)
+            except SkipHandler:
+                continue
+        if entry.complete:
+            return UNHANDLED
+        return await handler(event, data)
+
+    @staticmethod
+    async def _call(route: Route, event: Message, data: Dict[str, Any]) -> Any:
+        observer = route.router.message
+        kwargs = dict(data, event_router=route.router, handler=route.handler)
+        wrapped = observer.outer_middleware.wrap_middlewares(observer._resolve_middlewares(), route.handler.call)
+        return await wrapped(event, kwargs)
+
+
+__all__ = ["Route", "TextDispatchMiddleware"]
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage
+from aiogram.fsm.storage.memory import SimpleEventIsolation
+
+from app.bot.storage.memory import BoundedMemoryStorage
+from app.bot.storage.sql import SQLAlchemyStorage
+from app.config import Settings
+from app.database.session import Database
+from app.media.store import FileStore, OrphanReclaimer
+
+
+def create_storage(settings: Settings, database: Database) -> BaseStorage:
+    backend = settings.fsm_storage.lower()
+    if backend == "memory":
+        return BoundedMemoryStorage(
+            ttl=settings.fsm_memory_ttl,
+            max_entries=settings.fsm_memory_max_entries,
+            on_evict=OrphanReclaimer(
+                database.session_factory,
+                [
+                    FileStore(settings.tracks_dir, settings.file_grace_seconds),
+                    FileStore(settings.covers_dir, settings.file_grace_seconds),
+                ],
+            ),
+        )
+    if backend == "sql":
+        return SQLAlchemyStorage(database)
+    raise RuntimeError(f"Unknown FSM_STORAGE backend: {settings.fsm_storage}")
+
+
+def create_events_isolation(storage: BaseStorage) -> BaseEventIsolation:
+    create_isolation = getattr(storage, "create_isolation", None)
+    if create_isolation is not None:
+        return create_isolation()
+    return SimpleEventIsolation()
+
+
+__all__ = [
+    "BoundedMemoryStorage",
+    "SQLAlchemyStorage",
+    "create_events_isolation",
+    "create_storage",
+]
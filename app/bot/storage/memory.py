@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+UPLOAD_FILE_KEYS = ("track_file", "cover_file")
+
+EvictCallback = Callable[[StorageKey, List[str]], None]
+
+
+class _Entry:
+    __slots__ = ("state", "data", "touched_at", "size")
+
+    def __init__(self, touched_at: float):
+        self.state: Optional[str] = None
+        self.data: Dict[str, Any] = {}
+        self.touched_at = touched_at
+        self.size = 0
+
+
+def _approx_size(value: Any) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_approx_size(k) + _approx_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_approx_size(item) for item in value)
+    return size
+
+
+class BoundedMemoryStorage(BaseStorage):
+    def __init__(
+        self,
+        ttl: float = 86400.0,
+        max_entries: int = 10000,
+        on_evict: Optional[EvictCallback] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._on_evict = on_evict
+        self._clock = clock
+        self._entries: "OrderedDict[StorageKey, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.evicted = 0
+
+    @property
+    def entry_count(self) -> int:
+        return len(self._entries)
+
+    @property
+    def approx_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": self.entry_count, "bytes": self.approx_bytes, "evicted": self.evicted}
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = self._touch(key, create=state is not None)
+        if entry is None:
+            return
+        entry.state = state.state if isinstance(state, State) else state
+        self._finish_write(key, entry)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        entry = self._touch(key)
+        return entry.state if entry else None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        entry = self._touch(key, create=bool(data))
+        if entry is None:
+            return
+        entry.data = dict(data)
+        self._finish_write(key, entry)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        entry = self._touch(key)
+        return dict(entry.data) if entry else {}
+
+    async def close(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def purge_expired(self) -> int:
+        deadline = self._clock() - self.ttl
+        purged = 0
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.touched_at > deadline:
+                break
+            self._evict(key)
+            purged += 1
+        return purged
+
+    def _touch(self, key: StorageKey, create: bool = False) -> Optional[_Entry]:
+        self.purge_expired()
+        entry = self._entries.get(key)
+        now = self._clock()
+        if entry is None:
+            if not create:
+                return None
+            entry = self._entries[key] = _Entry(now)
+        else:
+            entry.touched_at = now
+            self._entries.move_to_end(key)
+        return entry
+
+    def _finish_write(self, key: StorageKey, entry: _Entry) -> None:
+        if entry.state is None and not entry.data:
+            self._remove(key)
+            return
+        self._bytes -= entry.size
+        entry.size = sys.getsizeof(entry) + _approx_size(entry.state) + _approx_size(entry.data)
+        self._bytes += entry.size
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def _remove(self, key: StorageKey) -> Optional[_Entry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def _evict(self, key: StorageKey) -> None:
+        entry = self._remove(key)
+        if entry is None:
+            return
+        self.evicted += 1
+        if self._on_evict is None:
+            return
+        paths = [entry.data[name] for name in UPLOAD_FILE_KEYS if entry.data.get(name)]
+        self._on_evict(key, paths)
+
+
+__all__ = ["BoundedMemoryStorage", "UPLOAD_FILE_KEYS"]
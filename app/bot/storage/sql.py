@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from sqlalchemy import delete, select, tuple_
+
+from app.database import models
+from app.database.session import Database
+
+logger = logging.getLogger(__name__)
+
+_RowKey = Tuple[int, int, int, int, str]
+_KEY_COLUMNS = ("bot_id", "chat_id", "user_id", "thread_id", "destiny")
+_UNSET = object()
+
+
+@dataclass(slots=True)
+class _PendingWrite:
+    state: Any = _UNSET
+    data: Any = _UNSET
+    updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def _row_key(key: StorageKey) -> _RowKey:
+    return (key.bot_id, key.chat_id, key.user_id, key.thread_id or 0, key.destiny)
+
+
+def _state_name(state: StateType) -> Optional[str]:
+    if isinstance(state, State):
+        return state.state
+    return state
+
+
+class SQLAlchemyStorage(BaseStorage):
+    # Writes made while an update is handled are buffered and committed together by
+    # FsmFlushMiddleware when the handler returns. Only keys with writes not yet committed are
+    # read from the buffer; everything else is read from the database, so all bot processes
+    # share one view.
+    def __init__(self, database: Database):
+        self._session_factory = database.session_factory
+        self._dialect = database.engine.dialect.name
+        self._pending: Dict[_RowKey, _PendingWrite] = {}
+        self._inflight: Dict[_RowKey, _PendingWrite] = {}
+        self._flush_lock = asyncio.Lock()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        self._pending_for(key).state = _state_name(state)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        buffered = self._buffered(_row_key(key), "state")
+        if buffered is not _UNSET:
+            return buffered
+        row = await self._load(key)
+        return row.state if row else None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        self._pending_for(key).data = dict(data)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        buffered = self._buffered(_row_key(key), "data")
+        if buffered is not _UNSET:
+            return dict(buffered)
+        row = await self._load(key)
+        return dict(row.data or {}) if row else {}
+
+    async def close(self) -> None:
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            self._inflight, self._pending = self._pending, {}
+            try:
+                await self._write(self._inflight)
+            except Exception:
+                # Kept for the next flush, which the next update (or close()) triggers.
+                logger.exception("Failed to flush %s FSM records", len(self._inflight))
+                for row_key, write in self._inflight.items():
+                    newer = self._pending.get(row_key)
+                    if newer is None:
+                        self._pending[row_key] = write
+                        continue
+                    # Writes made during the failed flush win; fields they did not touch keep
+                    # the failed values.
+                    if newer.state is _UNSET:
+                        newer.state = write.state
+                    if newer.data is _UNSET:
+                        newer.data = write.data
+                raise
+            finally:
+                self._inflight = {}
+
+    def _pending_for(self, key: StorageKey) -> _PendingWrite:
+        row_key = _row_key(key)
+        write = self._pending.get(row_key)
+        if write is None:
+            write = self._pending[row_key] = _PendingWrite()
+        write.updated_at = datetime.now(timezone.utc)
+        return write
+
+    def _buffered(self, row_key: _RowKey, attr: str) -> Any:
+        for source in (self._pending, self._inflight):
+            write = source.get(row_key)
+            if write is not None:
+                value = getattr(write, attr)
+                if value is not _UNSET:
+                    return value
+        return _UNSET
+
+    async def _load(self, key: StorageKey) -> Optional[models.FsmState]:
+        bot_id, chat_id, user_id, thread_id, destiny = _row_key(key)
+        stmt = select(models.FsmState).where(
+            models.FsmState.bot_id == bot_id,
+            models.FsmState.chat_id == chat_id,
+            models.FsmState.user_id == user_id,
+            models.FsmState.thread_id == thread_id,
+            models.FsmState.destiny == destiny,
+        )
+        async with self._session_factory() as session:
+            result = await session.execute(stmt)
+            return result.scalar_one_or_none()
+
+    async def _write(self, writes: Mapping[_RowKey, _PendingWrite]) -> None:
+        cleared: List[_RowKey] = []
+        upserts: Dict[Tuple[bool, bool], List[Dict[str, Any]]] = {}
+        for row_key, write in writes.items():
+            if write.state is None and write.data == {}:
+                cleared.append(row_key)
+                continue
+            has_state = write.state is not _UNSET
+            has_data = write.data is not _UNSET
+            row: Dict[str, Any] = dict(zip(_KEY_COLUMNS, row_key))
+            row["state"] = write.state if has_state else None
+            row["data"] = write.data if has_data else None
+            row["updated_at"] = write.updated_at
+            upserts.setdefault((has_state, has_data), []).append(row)
+
+        async with self._session_factory() as session:
+            if cleared:
+                columns = [getattr(models.FsmState, name) for name in _KEY_COLUMNS]
+                await session.execute(delete(models.FsmState).where(tuple_(*columns).in_(cleared)))
+            for (has_state, has_data), rows in upserts.items():
+                await session.execute(self._upsert(rows, has_state, has_data))
+            await session.commit()
+
+    def _upsert(self, rows: List[Dict[str, Any]], has_state: bool, has_data: bool):
+        if self._dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif self._dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise RuntimeError(f"FSM storage does not support the {self._dialect} dialect")
+        stmt = insert(models.FsmState).values(rows)
+        updates = {"updated_at": stmt.excluded.updated_at}
+        if has_state:
+            updates["state"] = stmt.excluded.state
+        if has_data:
+            updates["data"] = stmt.excluded.data
+        return stmt.on_conflict_do_update(index_elements=list(_KEY_COLUMNS), set_=updates)
+
+
+__all__ = ["SQLAlchemyStorage"]
@@ -0,0 +1,3 @@
+from app.broadcast.engine import BroadcastEngine
+
+__all__ = ["BroadcastEngine"]
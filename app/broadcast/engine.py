@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError
+
+from app.database import crud, models
+from app.logging import logger
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+SENT = "sent"
+FAILED = "failed"
+BLOCKED = "blocked"
+
+
+class BroadcastEngine:
+    # Every bot process runs an engine; a campaign is delivered only by the process holding its
+    # lease. Leases are renewed while sending and taken over by another process once expired.
+    def __init__(
+        self,
+        session_factory,
+        rate: float = 20.0,
+        batch_size: int = 100,
+        stop_timeout: float = 15.0,
+        lease_seconds: int = 120,
+        worker_id: Optional[str] = None,
+    ):
+        self._session_factory = session_factory
+        self._interval = 1.0 / rate
+        self._batch_size = batch_size
+        self._stop_timeout = stop_timeout
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._cancelled: set[int] = set()
+        self._stopping = False
+        self._watcher: Optional[asyncio.Task] = None
+
+    def running(self) -> List[int]:
+        return sorted(self._tasks)
+
+    async def create(self, bot: "Bot", text: str, created_by: Optional[int]) -> models.BroadcastCampaign:
+        async with self._session_factory() as session:
+            campaign = await crud.create_broadcast_campaign(session, text, created_by, self.worker_id, self._lease_deadline())
+            await session.commit()
+        logger.info("Broadcast %s created for %s recipients", campaign.id, campaign.total)
+        self.start(bot, campaign.id)
+        return campaign
+
+    def start(self, bot: "Bot", campaign_id: int) -> None:
+        if campaign_id in self._tasks or self._stopping:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(bot, campaign_id))
+        self._tasks[campaign_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(campaign_id, None))
+
+    async def resume(self, bot: "Bot") -> None:
+        await self._adopt(bot)
+        if self._watcher is None:
+            self._watcher = asyncio.get_running_loop().create_task(self._watch(bot))
+
+    async def _adopt(self, bot: "Bot") -> None:
+        if self._stopping:
+            return
+        async with self._session_factory() as session:
+            campaign_ids = await crud.claim_broadcasts(session, self.worker_id, self._lease_deadline())
+            await session.commit()
+        for campaign_id in campaign_ids:
+            logger.info("Resuming broadcast %s", campaign_id)
+            self.start(bot, campaign_id)
+
+    async def _watch(self, bot: "Bot") -> None:
+        # Picks up campaigns whose owner stopped without releasing them.
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                await self._adopt(bot)
+            except Exception:
+                logger.exception("Failed to claim broadcasts")
+
+    async def cancel(self, campaign_id: int) -> bool:
+        async with self._session_factory() as session:
+            campaign = await session.get(models.BroadcastCampaign, campaign_id)
+            if campaign is None or campaign.status != "running":
+                return False
+            await crud.finish_broadcast(session, campaign_id, "cancelled")
+            await session.commit()
+        self._cancelled.add(campaign_id)
+        return True
+
+    async def shutdown(self) -> None:
+        # Let the current batch finish so its checkpoint is written; campaigns stay
+        # "running" in the database and are resumed on the next start.
+        self._stopping = True
+        if self._watcher is not None:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+        tasks = list(self._tasks.values())
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self._stop_timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        # Released leases let another process, or this one after a restart, continue at once.
+        async with self._session_factory() as session:
+            await crud.release_broadcast_leases(session, self.worker_id)
+            await session.commit()
+
+    async def _run(self, bot: "Bot", campaign_id: int) -> None:
+        heartbeat = asyncio.get_running_loop().create_task(self._heartbeat(campaign_id))
+        try:
+            async with self._session_factory() as session:
+                campaign = await session.get(models.BroadcastCampaign, campaign_id)
+            if campaign is None or campaign.status != "running" or campaign.lease_owner != self.worker_id:
+                return
+            text, last_user_id = campaign.text, campaign.last_user_id
+            while not self._stopping and campaign_id not in self._cancelled:
+                if heartbeat.done():
+                    logger.warning("Broadcast %s lease lost, stopping", campaign_id)
+                    return
+                async with self._session_factory() as session:
+                    recipients = await crud.next_broadcast_recipients(session, last_user_id, self._batch_size)
+                if not recipients:
+                    async with self._session_factory() as session:
+                        await crud.finish_broadcast(session, campaign_id, "done", owner=self.worker_id)
+                        await session.commit()
+                    logger.info("Broadcast %s finished", campaign_id)
+                    return
+                outcomes = await self._deliver_batch(bot, text, recipients)
+                last_user_id = recipients[-1][0]
+                blocked = [user_id for (user_id, _), outcome in zip(recipients, outcomes) if outcome == BLOCKED]
+                async with self._session_factory() as session:
+                    status = await crud.checkpoint_broadcast(
+                        session,
+                        campaign_id,
+                        last_user_id,
+                        sent=outcomes.count(SENT),
+                        failed=outcomes.count(FAILED),
+                        blocked_user_ids=blocked,
+                        owner=self.worker_id,
+                        lease_expires_at=self._lease_deadline(),
+                    )
+                    await session.commit()
+                if status is None:
+                    logger.warning("Broadcast %s lease lost, stopping", campaign_id)
+                    return
+                if status != "running":
+                    return
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Broadcast %s stopped", campaign_id)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+            self._cancelled.discard(campaign_id)
+
+    async def _heartbeat(self, campaign_id: int) -> None:
+        # Returns once the lease is gone, which _run checks before every batch.
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self._session_factory() as session:
+                    held = await crud.extend_broadcast_lease(session, campaign_id, self.worker_id, self._lease_deadline())
+                    await session.commit()
+            except Exception:
+                logger.exception("Failed to extend broadcast %s lease", campaign_id)
+                continue
+            if not held:
+                return
+
+    def _lease_deadline(self) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+
+    async def _deliver_batch(self, bot: "Bot", text: str, recipients: List[Tuple[int, int]]) -> List[str]:
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        sends = []
+        for _, telegram_id in recipients:
+            delay = next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_at = max(next_at, loop.time() - self._interval) + self._interval
+            sends.append(asyncio.create_task(self._deliver(bot, telegram_id, text)))
+        return list(await asyncio.gather(*sends))
+
+    @staticmethod
+    async def _deliver(bot: "Bot", telegram_id: int, text: str) -> str:
+        try:
+            await bot.send_message(telegram_id, text)
+        except TelegramForbiddenError:
+            return BLOCKED
+        except TelegramAPIError as exc:
+            logger.warning("Broadcast message to %s failed: %s", telegram_id, exc)
+            return FAILED
+        return SENT
+
+
+__all__ = ["BroadcastEngine"]
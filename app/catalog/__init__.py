@@ -0,0 +1,25 @@
+from app.catalog.models import (
+    Catalog,
+    CatalogError,
+    CourseInfo,
+    LinkInfo,
+    PriceItem,
+    ReleaseService,
+    StudioInfo,
+    load_catalog,
+    parse_catalog,
+)
+from app.catalog.store import CatalogStore
+
+__all__ = [
+    "Catalog",
+    "CatalogError",
+    "CatalogStore",
+    "CourseInfo",
+    "LinkInfo",
+    "PriceItem",
+    "ReleaseService",
+    "StudioInfo",
+    "load_catalog",
+    "parse_catalog",
+]
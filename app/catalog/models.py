@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+
+class CatalogError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ReleaseService:
+    title: str
+    price: str
+    note: str
+
+
+@dataclass(frozen=True)
+class CourseInfo:
+    title: str
+    price: str
+    link: str
+
+
+@dataclass(frozen=True)
+class StudioInfo:
+    title: str
+    address: str
+    description: str
+
+
+@dataclass(frozen=True)
+class PriceItem:
+    title: str
+    price: str
+
+
+@dataclass(frozen=True)
+class LinkInfo:
+    title: str
+    url: str
+
+
+@dataclass(frozen=True)
+class Catalog:
+    version: int
+    manager: str
+    custom_build_manager: str
+    release_services: Tuple[ReleaseService, ...]
+    courses: Tuple[CourseInfo, ...]
+    studios: Tuple[StudioInfo, ...]
+    studio_services: Tuple[PriceItem, ...]
+    ready_builds: Tuple[PriceItem, ...]
+    links: Tuple[LinkInfo, ...]
+
+
+def _items(raw: Dict[str, Any], name: str, factory) -> Tuple[Any, ...]:
+    entries: List[Dict[str, Any]] = raw.get(name) or []
+    try:
+        items = tuple(factory(**entry) for entry in entries)
+    except TypeError as exc:
+        raise CatalogError(f"Invalid entry in catalog section {name}: {exc}") from exc
+    titles = [item.title for item in items]
+    if len(set(titles)) != len(titles):
+        raise CatalogError(f"Duplicate titles in catalog section {name}")
+    return items
+
+
+def parse_catalog(raw: Dict[str, Any]) -> Catalog:
+    if not isinstance(raw, dict):
+        raise CatalogError("Catalog must be a JSON object")
+    if not isinstance(raw.get("version"), int):
+        raise CatalogError("Catalog version must be an integer")
+    catalog = Catalog(
+        version=raw["version"],
+        manager=raw.get("manager", ""),
+        custom_build_manager=raw.get("custom_build_manager") or raw.get("manager", ""),
+        release_services=_items(raw, "release_services", ReleaseService),
+        courses=_items(raw, "courses", CourseInfo),
+        studios=_items(raw, "studios", StudioInfo),
+        studio_services=_items(raw, "studio_services", PriceItem),
+        ready_builds=_items(raw, "ready_builds", PriceItem),
+        links=_items(raw, "links", LinkInfo),
+    )
+    if not catalog.release_services:
+        raise CatalogError("Catalog has no release services")
+    return catalog
+
+
+def load_catalog(path: Path) -> Catalog:
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as exc:
+        raise CatalogError(f"Cannot read catalog {path}: {exc}") from exc
+    return parse_catalog(raw)
+
+
+__all__ = [
+    "Catalog",
+    "CatalogError",
+    "CourseInfo",
+    "LinkInfo",
+    "PriceItem",
+    "ReleaseService",
+    "StudioInfo",
+    "load_catalog",
+    "parse_catalog",
+]
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Callable, Generic, Optional, Tuple, TypeVar
+
+from app.catalog.models import Catalog, CatalogError, load_catalog
+from app.logging import logger
+
+ViewT = TypeVar("ViewT")
+
+
+class CatalogStore(Generic[ViewT]):
+    def __init__(self, path: Path, render: Callable[[Catalog], ViewT], reload_interval: float = 30.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._render = render
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._catalog: Optional[Catalog] = None
+        self._view: Optional[ViewT] = None
+        self._task: Optional[asyncio.Task] = None
+        self.reload(force=True)
+
+    @property
+    def catalog(self) -> Catalog:
+        return self._catalog
+
+    @property
+    def view(self) -> ViewT:
+        # The snapshot is replaced as a whole, so readers never see a half-updated catalog.
+        return self._view
+
+    @property
+    def version(self) -> int:
+        return self._catalog.version
+
+    def reload(self, force: bool = False) -> bool:
+        try:
+            stat = os.stat(self.path)
+        except OSError as exc:
+            if self._view is None:
+                raise RuntimeError(f"Catalog file {self.path} is not available: {exc}") from exc
+            logger.warning("Catalog file %s is not available, keeping version %s", self.path, self.version)
+            return False
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if not force and stamp == self._stamp:
+            return False
+        try:
+            catalog = load_catalog(self.path)
+            view = self._render(catalog)
+        except CatalogError as exc:
+            if self._view is None:
+                raise RuntimeError(str(exc)) from exc
+            logger.error("Catalog reload failed, keeping version %s: %s", self.version, exc)
+            self._stamp = stamp
+            return False
+        self._stamp = stamp
+        if self._catalog is not None and catalog == self._catalog:
+            return False
+        self._catalog, self._view = catalog, view
+        logger.info("Catalog version %s loaded from %s", catalog.version, self.path)
+        return True
+
+    async def start(self) -> None:
+        if self.reload_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                self.reload()
+            except Exception:
+                logger.exception("Catalog watcher failed")
+
+
+__all__ = ["CatalogStore"]
@@ -20,18 +20,71 @@ class Settings:
     consent_version: str = "v1"
     consent_text_path: Path = Path("app/resources/privacy_consent_v1.txt")
     contract_template_path: Path = Path("app/contracts/templates/contract.html.j2")
+    mail_templates_path: Path = Path("app/mailer/templates")
+    contract_render_processes: int = 2
+    contract_render_queue: int = 16
+    contract_render_timeout: float = 60.0
+    job_processes: int = 1
+    job_concurrency: int = 2
+    job_lease_seconds: int = 300
+    job_max_idle: float = 30.0
+    catalog_path: Path = Path("app/resources/catalog.json")
+    catalog_reload_interval: float = 30.0
     smtp_host: Optional[str] = None
     smtp_port: int = 587
     smtp_user: Optional[str] = None
     smtp_password: Optional[str] = None
     smtp_use_tls: bool = True
+    smtp_pool_size: int = 4
+    smtp_timeout: float = 30.0
     mail_from: Optional[str] = None
+    mail_batch_size: int = 50
+    mail_concurrency: int = 8
+    mail_lease_seconds: int = 120
+    mailer_processes: int = 1
+    mail_max_idle: float = 30.0
+    mail_attachment_cache_mb: int = 64
+    mail_retention_days: int = 30
     robokassa_merchant_login: Optional[str] = None
     robokassa_password1: Optional[str] = None
     robokassa_password2: Optional[str] = None
     robokassa_is_test: bool = True
     robokassa_culture: str = "ru"
     robokassa_signature_algo: str = "sha256"
+    bot_mode: str = "polling"
+    web_host: str = "0.0.0.0"
+    web_port: int = 8080
+    webhook_path: str = "/telegram/webhook"
+    webhook_secret: Optional[str] = None
+    fsm_storage: str = "sql"
+    fsm_memory_ttl: float = 86400.0
+    fsm_memory_max_entries: int = 10000
+    max_parallel_downloads: int = 4
+    min_free_disk_mb: int = 512
+    file_grace_seconds: float = 86400.0
+    file_sweep_interval: float = 3600.0
+    download_timeout: int = 300
+    cover_min_size: int = 3000
+    cover_workers: int = 2
+    analysis_workers: int = 1
+    throttle_text_rate: float = 1.0
+    throttle_text_burst: int = 5
+    throttle_media_rate: float = 0.2
+    throttle_media_burst: int = 3
+    throttle_global_text_rate: float = 30.0
+    throttle_global_text_burst: int = 60
+    throttle_global_media_rate: float = 2.0
+    throttle_global_media_burst: int = 10
+    throttle_max_users: int = 10000
+    throttle_notice_cooldown: float = 10.0
+    outbound_global_rate: float = 30.0
+    outbound_chat_rate: float = 1.0
+    outbound_group_rate: float = 0.33
+    outbound_chat_burst: int = 3
+    outbound_max_retries: int = 3
+    broadcast_rate: float = 20.0
+    broadcast_batch_size: int = 100
+    broadcast_lease_seconds: int = 120
 
     @property
     def data_dir(self) -> Path:
@@ -45,16 +98,42 @@ class Settings:
     def covers_dir(self) -> Path:
         return self.base_dir / "covers"
 
+    @property
+    def cover_thumbnails_dir(self) -> Path:
+        return self.base_dir / "cover_thumbs"
+
     @property
     def contracts_dir(self) -> Path:
         path = self.base_dir / "contracts"
         path.mkdir(parents=True, exist_ok=True)
         return path
 
+    @property
+    def mail_spool_dir(self) -> Path:
+        return self.base_dir / "outbox"
+
+    @property
+    def mail_templates(self) -> Path:
+        return self.mail_templates_path.resolve()
+
+    @property
+    def mail_template_cache_dir(self) -> Path:
+        return self.base_dir / "cache" / "mail_templates"
+
     @property
     def contract_template(self) -> Path:
         return self.contract_template_path.resolve()
 
+    @property
+    def use_webhook(self) -> bool:
+        return self.bot_mode.lower() == "webhook"
+
+    @property
+    def webhook_url(self) -> str:
+        if not self.public_base_url:
+            raise RuntimeError("PUBLIC_BASE_URL is required for webhook mode")
+        return f"{self.public_base_url.rstrip('/')}{self.webhook_path}"
+
     @property
     def log_level(self) -> str:
         return "INFO" if self.environment.lower() == "prod" else "DEBUG"
@@ -64,7 +143,7 @@ class Settings:
         load_dotenv()
         base_dir = Path(os.getenv("BASE_DIR", "./data")).resolve()
         base_dir.mkdir(parents=True, exist_ok=True)
-        for sub in ("tracks", "covers"):
+        for sub in ("tracks", "covers", "cover_thumbs"):
             (base_dir / sub).mkdir(parents=True, exist_ok=True)
 
         consent_text_path = Path(
@@ -75,6 +154,8 @@ class Settings:
             os.getenv("CONTRACT_TEMPLATE_PATH", "app/contracts/templates/contract.html.j2")
         ).resolve()
 
+        catalog_path = Path(os.getenv("CATALOG_PATH", "app/resources/catalog.json")).resolve()
+
         return cls(
             bot_token=_require_env("BOT_TOKEN"),
             admin_username=os.getenv("ADMIN_USERNAME", ""),
@@ -85,18 +166,71 @@ class Settings:
             consent_version=os.getenv("CONSENT_VERSION", "v1"),
             consent_text_path=consent_text_path,
             contract_template_path=contract_template_path,
+            mail_templates_path=Path(os.getenv("MAIL_TEMPLATES_PATH", "app/mailer/templates")),
+            contract_render_processes=int(os.getenv("CONTRACT_RENDER_PROCESSES", "2")),
+            contract_render_queue=int(os.getenv("CONTRACT_RENDER_QUEUE", "16")),
+            contract_render_timeout=float(os.getenv("CONTRACT_RENDER_TIMEOUT", "60")),
+            job_processes=int(os.getenv("JOB_PROCESSES", "1")),
+            job_concurrency=int(os.getenv("JOB_CONCURRENCY", "2")),
+            job_lease_seconds=int(os.getenv("JOB_LEASE_SECONDS", "300")),
+            job_max_idle=float(os.getenv("JOB_MAX_IDLE", "30")),
+            catalog_path=catalog_path,
+            catalog_reload_interval=float(os.getenv("CATALOG_RELOAD_INTERVAL", "30")),
             smtp_host=os.getenv("SMTP_HOST"),
             smtp_port=int(os.getenv("SMTP_PORT", "587")),
             smtp_user=os.getenv("SMTP_USER"),
             smtp_password=os.getenv("SMTP_PASS"),
             smtp_use_tls=os.getenv("SMTP_USE_TLS", "1") != "0",
+            smtp_pool_size=int(os.getenv("SMTP_POOL_SIZE", "4")),
+            smtp_timeout=float(os.getenv("SMTP_TIMEOUT", "30")),
             mail_from=os.getenv("MAIL_FROM"),
+            mail_batch_size=int(os.getenv("MAIL_BATCH_SIZE", "50")),
+            mail_concurrency=int(os.getenv("MAIL_CONCURRENCY", "8")),
+            mail_lease_seconds=int(os.getenv("MAIL_LEASE_SECONDS", "120")),
+            mailer_processes=int(os.getenv("MAILER_PROCESSES", "1")),
+            mail_max_idle=float(os.getenv("MAIL_MAX_IDLE", "30")),
+            mail_attachment_cache_mb=int(os.getenv("MAIL_ATTACHMENT_CACHE_MB", "64")),
+            mail_retention_days=int(os.getenv("MAIL_RETENTION_DAYS", "30")),
             robokassa_merchant_login=os.getenv("ROBOKASSA_MERCHANT_LOGIN"),
             robokassa_password1=os.getenv("ROBOKASSA_PASSWORD1"),
             robokassa_password2=os.getenv("ROBOKASSA_PASSWORD2"),
             robokassa_is_test=os.getenv("ROBOKASSA_IS_TEST", "1") == "1",
             robokassa_culture=os.getenv("ROBOKASSA_CULTURE", "ru"),
             robokassa_signature_algo=os.getenv("ROBOKASSA_SIGNATURE_ALGO", "sha256"),
+            bot_mode=os.getenv("BOT_MODE", "polling"),
+            web_host=os.getenv("WEB_HOST", "0.0.0.0"),
+            web_port=int(os.getenv("WEB_PORT", "8080")),
+            webhook_path=os.getenv("WEBHOOK_PATH", "/telegram/webhook"),
+            webhook_secret=os.getenv("WEBHOOK_SECRET"),
+            fsm_storage=os.getenv("FSM_STORAGE", "sql"),
+            fsm_memory_ttl=float(os.getenv("FSM_MEMORY_TTL", "86400")),
+            fsm_memory_max_entries=int(os.getenv("FSM_MEMORY_MAX_ENTRIES", "10000")),
+            max_parallel_downloads=int(os.getenv("MAX_PARALLEL_DOWNLOADS", "4")),
+            min_free_disk_mb=int(os.getenv("MIN_FREE_DISK_MB", "512")),
+            file_grace_seconds=float(os.getenv("FILE_GRACE_SECONDS", "86400")),
+            file_sweep_interval=float(os.getenv("FILE_SWEEP_INTERVAL", "3600")),
+            download_timeout=int(os.getenv("DOWNLOAD_TIMEOUT", "300")),
+            cover_min_size=int(os.getenv("COVER_MIN_SIZE", "3000")),
+            cover_workers=int(os.getenv("COVER_WORKERS", "2")),
+            analysis_workers=int(os.getenv("ANALYSIS_WORKERS", "1")),
+            throttle_text_rate=float(os.getenv("THROTTLE_TEXT_RATE", "1")),
+            throttle_text_burst=int(os.getenv("THROTTLE_TEXT_BURST", "5")),
+            throttle_media_rate=float(os.getenv("THROTTLE_MEDIA_RATE", "0.2")),
+            throttle_media_burst=int(os.getenv("THROTTLE_MEDIA_BURST", "3")),
+            throttle_global_text_rate=float(os.getenv("THROTTLE_GLOBAL_TEXT_RATE", "30")),
+            throttle_global_text_burst=int(os.getenv("THROTTLE_GLOBAL_TEXT_BURST", "60")),
+            throttle_global_media_rate=float(os.getenv("THROTTLE_GLOBAL_MEDIA_RATE", "2")),
+            throttle_global_media_burst=int(os.getenv("THROTTLE_GLOBAL_MEDIA_BURST", "10")),
+            throttle_max_users=int(os.getenv("THROTTLE_MAX_USERS", "10000")),
+            throttle_notice_cooldown=float(os.getenv("THROTTLE_NOTICE_COOLDOWN", "10")),
+            outbound_global_rate=float(os.getenv("OUTBOUND_GLOBAL_RATE", "30")),
+            outbound_chat_rate=float(os.getenv("OUTBOUND_CHAT_RATE", "1")),
+            outbound_group_rate=float(os.getenv("OUTBOUND_GROUP_RATE", "0.33")),
+            outbound_chat_burst=int(os.getenv("OUTBOUND_CHAT_BURST", "3")),
+            outbound_max_retries=int(os.getenv("OUTBOUND_MAX_RETRIES", "3")),
+            broadcast_rate=float(os.getenv("BROADCAST_RATE", "20")),
+            broadcast_batch_size=int(os.getenv("BROADCAST_BATCH_SIZE", "100")),
+            broadcast_lease_seconds=int(os.getenv("BROADCAST_LEASE_SECONDS", "120")),
         )
 
 
@@ -1,4 +1,5 @@
 
+from app.contracts.renderer import ContractRenderer, RenderFailed, RenderQueueFull
 from app.contracts.service import ContractContext, ContractService
 
-__all__ = ["ContractContext", "ContractService"]
+__all__ = ["ContractContext", "ContractRenderer", "ContractService", "RenderFailed", "RenderQueueFull"]
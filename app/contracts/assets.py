@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import os
+from typing import Dict, Tuple
+from urllib.request import url2pathname
+
+from weasyprint import urls as weasyprint_urls
+
+CacheKey = Tuple[str, int, int]
+
+
+def _cache_key(url: str) -> CacheKey:
+    # Local files are keyed by mtime and size so an edited logo or font is read again.
+    if url.startswith("file:"):
+        try:
+            stat = os.stat(url2pathname(url.split("?")[0].removeprefix("file:")))
+        except OSError:
+            return (url, 0, 0)
+        return (url, stat.st_mtime_ns, stat.st_size)
+    return (url, 0, 0)
+
+
+if hasattr(weasyprint_urls, "URLFetcher"):
+
+    class CachingURLFetcher(weasyprint_urls.URLFetcher):
+        # Stylesheets, fonts and images referenced by the contract template are fetched once per
+        # process; every render gets a fresh response over the cached bytes.
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self._entries: Dict[CacheKey, Tuple[str, bytes, Dict[str, str], int]] = {}
+            self._in_flight = False
+
+        def fetch(self, url, headers=None):
+            if self._in_flight:
+                # urllib re-enters through open() while following a redirect.
+                return super().fetch(url, headers)
+            key = _cache_key(url)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._in_flight = True
+                try:
+                    response = super().fetch(url, headers)
+                finally:
+                    self._in_flight = False
+                try:
+                    body = response.read()
+                finally:
+                    response.close()
+                entry = (response.url, body, dict(response.headers.items()), response.status)
+                self._entries[key] = entry
+            final_url, body, response_headers, status = entry
+            return weasyprint_urls.URLFetcherResponse(final_url, body, response_headers, status)
+
+else:
+
+    class CachingURLFetcher:  # type: ignore[no-redef]
+        # WeasyPrint before the URLFetcher class: fetchers are callables returning a dict.
+        def __init__(self, **kwargs):
+            self._kwargs = kwargs
+            self._entries: Dict[CacheKey, Dict[str, object]] = {}
+
+        def __call__(self, url):
+            key = _cache_key(url)
+            entry = self._entries.get(key)
+            if entry is None:
+                result = weasyprint_urls.default_url_fetcher(url, **self._kwargs)
+                file_obj = result.pop("file_obj", None)
+                if file_obj is not None:
+                    try:
+                        result["string"] = file_obj.read()
+                    finally:
+                        file_obj.close()
+                entry = result
+                self._entries[key] = entry
+            return dict(entry)
+
+
+__all__ = ["CachingURLFetcher"]
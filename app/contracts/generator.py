@@ -3,19 +3,23 @@ from __future__ import annotations
 import logging
 import re
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
-from weasyprint import HTML
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
 
+from app.contracts.assets import CachingURLFetcher
 from app.utils.files import ensure_parent
 
 logger = logging.getLogger(__name__)
 
+WARM_UP_HTML = "<h1>Договор</h1><p><strong>Заказчик:</strong> прогрев шрифтов</p>"
+
 
 class ContractGenerator:
     def __init__(self, template_path: Path):
@@ -23,6 +27,13 @@ class ContractGenerator:
         loader = FileSystemLoader(str(template_path.parent))
         self.env = Environment(loader=loader, autoescape=select_autoescape(["html", "xml"]))
         self.template = self.env.get_template(template_path.name)
+        # contract.html.j2 is styled by contract.css next to it, parsed once instead of per render.
+        self.stylesheet_path = template_path.with_name(f"{template_path.name.split('.')[0]}.css")
+        self._font_config: Optional[FontConfiguration] = None
+        self._url_fetcher: Optional[CachingURLFetcher] = None
+        self._stylesheets: List[CSS] = []
+        self._stylesheet_version: Optional[Tuple[int, int]] = None
+        self._image_cache: Dict[Any, Any] = {}
         self._fallback_font_registered = False
         self._font_name = "DejaVuSans"
 
@@ -30,16 +41,55 @@ class ContractGenerator:
         return self.template.render(**context)
 
     def generate(self, output_path: Path, context: Dict[str, Any]) -> Path:
+        return self.write_pdf(output_path, self.render(context))
+
+    def write_pdf(self, output_path: Path, html_content: str, fallback: bool = True) -> Path:
         ensure_parent(output_path)
-        html_content = self.render(context)
         try:
-            HTML(string=html_content, base_url=str(self.template_path.parent)).write_pdf(str(output_path))
+            self._write_weasyprint(html_content, str(output_path))
             return output_path
         except Exception:
+            if not fallback:
+                raise
             logger.exception("WeasyPrint rendering failed, using fallback PDF generator")
-            return self._fallback_generate(output_path, html_content)
+            return self.write_fallback_pdf(output_path, html_content)
+
+    def warm_up(self) -> None:
+        # Builds the font configuration, parses the stylesheet and fetches template assets, so the
+        # first real contract only pays for layout.
+        try:
+            self._write_weasyprint(WARM_UP_HTML)
+        except Exception:
+            logger.warning("WeasyPrint warm-up failed", exc_info=True)
+
+    def _write_weasyprint(self, html_content: str, target: Optional[str] = None) -> Optional[bytes]:
+        if self._font_config is None:
+            # Shared by every document in this process; @font-face rules add to it.
+            self._font_config = FontConfiguration()
+            self._url_fetcher = CachingURLFetcher()
+        document = HTML(string=html_content, base_url=str(self.template_path.parent), url_fetcher=self._url_fetcher)
+        return document.write_pdf(
+            target,
+            stylesheets=self._load_stylesheets(),
+            font_config=self._font_config,
+            cache=self._image_cache,
+        )
+
+    def _load_stylesheets(self) -> List[CSS]:
+        try:
+            stat = self.stylesheet_path.stat()
+        except FileNotFoundError:
+            return []
+        version = (stat.st_mtime_ns, stat.st_size)
+        if version != self._stylesheet_version:
+            self._stylesheets = [
+                CSS(filename=str(self.stylesheet_path), font_config=self._font_config, url_fetcher=self._url_fetcher)
+            ]
+            self._stylesheet_version = version
+            self._image_cache.clear()
+        return self._stylesheets
 
-    def _fallback_generate(self, output_path: Path, html_content: str) -> Path:
+    def write_fallback_pdf(self, output_path: Path, html_content: str) -> Path:
         ensure_parent(output_path)
         self._register_fallback_font()
         text_content = self._strip_html(html_content)
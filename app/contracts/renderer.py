@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+from app.config import Settings
+from app.contracts.generator import ContractGenerator
+
+logger = logging.getLogger(__name__)
+
+# Per-process generator, created once by the pool initializer.
+_generator: Optional[ContractGenerator] = None
+
+
+class RenderQueueFull(RuntimeError):
+    pass
+
+
+class RenderFailed(RuntimeError):
+    pass
+
+
+def _init_worker(template_path: str) -> None:
+    global _generator
+    _generator = ContractGenerator(Path(template_path))
+    _generator.warm_up()
+
+
+def _ping() -> None:
+    return None
+
+
+def _write_pdf(output_path: str, html_content: str) -> str:
+    assert _generator is not None
+    # No reportlab fallback here: a contract is either laid out by WeasyPrint or not sent.
+    return str(_generator.write_pdf(Path(output_path), html_content, fallback=False))
+
+
+class ContractRenderer:
+    def __init__(
+        self,
+        generator: ContractGenerator,
+        processes: int = 2,
+        max_pending: int = 16,
+        timeout: float = 60.0,
+    ):
+        self.generator = generator
+        self.processes = processes
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self.rendered = 0
+        self.failed = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings, generator: ContractGenerator) -> "ContractRenderer":
+        return cls(
+            generator,
+            processes=settings.contract_render_processes,
+            max_pending=settings.contract_render_queue,
+            timeout=settings.contract_render_timeout,
+        )
+
+    async def start(self) -> None:
+        # One task per process makes the pool spawn all of them now, so imports, font loading
+        # and the warm-up render happen before the first payment arrives.
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(executor, _ping) for _ in range(self.processes)))
+
+    async def render(self, output_path: Path, html_content: str) -> Path:
+        if self._pending >= self.max_pending:
+            raise RenderQueueFull(f"{self._pending} contracts are already waiting for rendering")
+        self._pending += 1
+        try:
+            executor = self._get_executor()
+            future = executor.submit(_write_pdf, str(output_path), html_content)
+            try:
+                path = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+            except asyncio.TimeoutError:
+                self._discard(executor, kill=True)
+                error = f"Contract rendering exceeded {self.timeout}s for {output_path}"
+            except BrokenProcessPool:
+                self._discard(executor)
+                error = f"Contract renderer process died while rendering {output_path}"
+            except Exception as exc:
+                error = f"Contract rendering failed for {output_path}: {exc}"
+            else:
+                self.rendered += 1
+                return Path(path)
+            # The caller retries later; a half-written PDF must not be mistaken for a contract.
+            self.failed += 1
+            output_path.unlink(missing_ok=True)
+            raise RenderFailed(error)
+        finally:
+            self._pending -= 1
+
+    async def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            # Workers are joined here, while the process is still running normally; left to the
+            # interpreter exit they can miss their stop signal and keep the process alive.
+            try:
+                await asyncio.wait_for(asyncio.to_thread(executor.shutdown, True, cancel_futures=True), self.timeout)
+            except asyncio.TimeoutError:
+                self._kill(executor)
+        logger.info("Contract renderer stopped: %s rendered, %s failed", self.rendered, self.failed)
+
+    def _discard(self, executor: ProcessPoolExecutor, kill: bool = False) -> None:
+        if self._executor is executor:
+            self._executor = None
+        if kill:
+            self._kill(executor)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _kill(executor: ProcessPoolExecutor) -> None:
+        # A hung WeasyPrint call cannot be cancelled; the pool has no public way to stop its
+        # workers before 3.14. Other renders on this pool fail and are retried by their jobs.
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.kill()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(str(self.generator.template_path),),
+            )
+        return self._executor
+
+
+__all__ = ["ContractRenderer", "RenderFailed", "RenderQueueFull"]
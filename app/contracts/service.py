@@ -3,14 +3,18 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Mapping, Optional
 from uuid import uuid4
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import Settings
 from app.contracts.generator import ContractGenerator
+from app.contracts.renderer import ContractRenderer
 from app.database import models
+from app.mailer.templating import MailTemplates
+from app.mailer.wakeup import mail_wakeup
+from app.utils.wakeup import QueueWakeup
 
 
 @dataclass(slots=True)
@@ -21,9 +25,23 @@ class ContractContext:
 
 
 class ContractService:
-    def __init__(self, settings: Settings):
+    def __init__(
+        self,
+        settings: Settings,
+        wakeup: Optional[QueueWakeup] = None,
+        templates: Optional[MailTemplates] = None,
+    ):
         self.settings = settings
+        self.wakeup = wakeup or mail_wakeup
+        self.templates = templates or MailTemplates.from_settings(settings)
         self.generator = ContractGenerator(settings.contract_template)
+        self.renderer = ContractRenderer.from_settings(settings, self.generator)
+
+    async def start(self) -> None:
+        await self.renderer.start()
+
+    async def shutdown(self) -> None:
+        await self.renderer.shutdown()
 
     def _build_output_path(self, release_id: int, timestamp: datetime) -> Path:
         relative = Path(str(release_id)) / f"{int(timestamp.timestamp())}.pdf"
@@ -46,7 +64,8 @@ class ContractService:
     async def create_contract(self, session: AsyncSession, context: ContractContext) -> models.Contract:
         timestamp = datetime.now(timezone.utc)
         output_path = self._build_output_path(context.release.id, timestamp)
-        pdf_path = self.generator.generate(output_path, self._build_context(context, timestamp))
+        html_content = self.generator.render(self._build_context(context, timestamp))
+        pdf_path = await self.renderer.render(output_path, html_content)
         contract = models.Contract(
             release_id=context.release.id,
             pdf_path=self._relative_pdf_path(pdf_path),
@@ -63,10 +82,13 @@ class ContractService:
         session: AsyncSession,
         contract: models.Contract,
         to_email: str,
-        subject: str,
-        html_body: str,
-        text_body: str,
+        context: Mapping[str, object],
+        template: str = "contract_ready",
     ) -> models.MailOutbox:
+        rendered = self.templates.render(
+            template,
+            {**context, "contract": contract, "accept_link": self.build_accept_link(contract)},
+        )
         now = datetime.now(timezone.utc)
         message_key = contract.mail_message_key or uuid4().hex
         contract.mail_message_key = message_key
@@ -79,9 +101,9 @@ class ContractService:
         ]
         mail = models.MailOutbox(
             to_email=to_email,
-            subject=subject,
-            html=html_body,
-            text=text_body,
+            subject=rendered.subject,
+            html=rendered.html,
+            text=rendered.text,
             attachments=attachments,
             message_key=message_key,
             status="pending",
@@ -90,6 +112,7 @@ class ContractService:
         )
         session.add(mail)
         await session.flush()
+        await self.wakeup.signal(session)
         return mail
 
     def build_accept_link(self, contract: models.Contract) -> str:
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import models
@@ -87,3 +87,174 @@ async def get_latest_consent_for_user(session: AsyncSession, telegram_id: int) -
     )
     result = await session.execute(stmt)
     return result.scalars().first()
+
+
+async def get_telegram_file(session: AsyncSession, file_unique_id: str) -> Optional[models.TelegramFile]:
+    return await session.get(models.TelegramFile, file_unique_id)
+
+
+def dialect_insert(session: AsyncSession, entity):
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Upserts are not supported on the {dialect} dialect")
+    return insert(entity)
+
+
+async def save_telegram_file(session: AsyncSession, file_unique_id: str, path: str, sha256: str, size: int) -> models.TelegramFile:
+    # Two chats can send the same file at once; the upsert keeps the last download.
+    stmt = dialect_insert(session, models.TelegramFile).values(
+        file_unique_id=file_unique_id, path=path, sha256=sha256, size=size
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[models.TelegramFile.file_unique_id],
+            set_={"path": stmt.excluded.path, "sha256": stmt.excluded.sha256, "size": stmt.excluded.size},
+        )
+    )
+    return await session.get(models.TelegramFile, file_unique_id, populate_existing=True)
+
+
+async def delete_telegram_files(session: AsyncSession, path: str) -> None:
+    await session.execute(delete(models.TelegramFile).where(models.TelegramFile.path == path))
+
+
+async def save_track_analysis(session: AsyncSession, release_id: int, **values) -> models.TrackAnalysis:
+    stmt = select(models.TrackAnalysis).where(models.TrackAnalysis.release_id == release_id)
+    result = await session.execute(stmt)
+    analysis = result.scalar_one_or_none()
+    if analysis is None:
+        analysis = models.TrackAnalysis(release_id=release_id)
+        session.add(analysis)
+    for name, value in values.items():
+        setattr(analysis, name, value)
+    await session.flush()
+    return analysis
+
+
+async def mark_user_active(session: AsyncSession, telegram_id: int) -> None:
+    await session.execute(
+        update(models.User)
+        .where(models.User.telegram_id == telegram_id, models.User.blocked_at.is_not(None))
+        .values(blocked_at=None)
+    )
+
+
+async def create_broadcast_campaign(
+    session: AsyncSession,
+    text: str,
+    created_by: Optional[int],
+    owner: str,
+    lease_expires_at: datetime,
+) -> models.BroadcastCampaign:
+    total = await session.scalar(select(func.count()).select_from(models.User).where(models.User.blocked_at.is_(None)))
+    campaign = models.BroadcastCampaign(
+        text=text,
+        created_by=created_by,
+        total=total or 0,
+        lease_owner=owner,
+        lease_expires_at=lease_expires_at,
+    )
+    session.add(campaign)
+    await session.flush()
+    return campaign
+
+
+async def get_latest_broadcast_campaign(session: AsyncSession) -> Optional[models.BroadcastCampaign]:
+    stmt = select(models.BroadcastCampaign).order_by(models.BroadcastCampaign.id.desc()).limit(1)
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def claim_broadcasts(session: AsyncSession, owner: str, lease_expires_at: datetime) -> List[int]:
+    # A conditional UPDATE: concurrent claimers re-check the lease after the row lock, so each
+    # unowned or expired campaign goes to exactly one process.
+    table = models.BroadcastCampaign
+    now = datetime.now(timezone.utc)
+    result = await session.execute(
+        update(table)
+        .where(
+            table.status == "running",
+            or_(table.lease_expires_at.is_(None), table.lease_expires_at < now),
+        )
+        .values(lease_owner=owner, lease_expires_at=lease_expires_at)
+        .returning(table.id)
+    )
+    return sorted(result.scalars())
+
+
+async def extend_broadcast_lease(session: AsyncSession, campaign_id: int, owner: str, lease_expires_at: datetime) -> bool:
+    table = models.BroadcastCampaign
+    result = await session.execute(
+        update(table)
+        .where(table.id == campaign_id, table.lease_owner == owner)
+        .values(lease_expires_at=lease_expires_at)
+    )
+    return result.rowcount == 1
+
+
+async def release_broadcast_leases(session: AsyncSession, owner: str) -> None:
+    table = models.BroadcastCampaign
+    await session.execute(
+        update(table).where(table.lease_owner == owner).values(lease_owner=None, lease_expires_at=None)
+    )
+
+
+async def next_broadcast_recipients(session: AsyncSession, after_user_id: int, limit: int) -> List[Tuple[int, int]]:
+    # Keyset pagination over the primary key keeps every page an index range scan.
+    stmt = (
+        select(models.User.id, models.User.telegram_id)
+        .where(models.User.id > after_user_id, models.User.blocked_at.is_(None))
+        .order_by(models.User.id)
+        .limit(limit)
+    )
+    result = await session.execute(stmt)
+    return [(row.id, row.telegram_id) for row in result]
+
+
+async def checkpoint_broadcast(
+    session: AsyncSession,
+    campaign_id: int,
+    last_user_id: int,
+    sent: int,
+    failed: int,
+    blocked_user_ids: Sequence[int],
+    owner: str,
+    lease_expires_at: datetime,
+) -> Optional[str]:
+    # Returns the campaign status, or None when the lease has passed to another process.
+    table = models.BroadcastCampaign
+    result = await session.execute(
+        update(table)
+        .where(table.id == campaign_id, table.lease_owner == owner)
+        .values(
+            last_user_id=last_user_id,
+            sent=table.sent + sent,
+            failed=table.failed + failed,
+            blocked=table.blocked + len(blocked_user_ids),
+            lease_expires_at=lease_expires_at,
+        )
+        .returning(table.status)
+    )
+    status = result.scalar_one_or_none()
+    if blocked_user_ids:
+        await session.execute(
+            update(models.User)
+            .where(models.User.id.in_(blocked_user_ids))
+            .values(blocked_at=datetime.now(timezone.utc))
+        )
+    return status
+
+
+async def finish_broadcast(session: AsyncSession, campaign_id: int, status: str, owner: Optional[str] = None) -> None:
+    # Without an owner (admin cancel) the lease is kept, so the owner's last checkpoint still lands.
+    table = models.BroadcastCampaign
+    stmt = update(table).where(table.id == campaign_id, table.status == "running")
+    values = {"status": status, "finished_at": datetime.now(timezone.utc)}
+    if owner is not None:
+        stmt = stmt.where(table.lease_owner == owner)
+        values.update(lease_owner=None, lease_expires_at=None)
+    await session.execute(stmt.values(**values))
@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Dict, List, Optional
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, JSON, Numeric, String, Text
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, ForeignKey, Index, Integer, JSON, Numeric, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database.base import Base
@@ -19,6 +19,7 @@ class User(Base):
     first_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     last_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    blocked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     releases: Mapped[List["Release"]] = relationship(back_populates="user", cascade="all, delete-orphan")
     consents: Mapped[List["Consent"]] = relationship(back_populates="user", cascade="all, delete-orphan")
@@ -43,6 +44,9 @@ class Release(Base):
     consent: Mapped[Optional["Consent"]] = relationship(back_populates="release", uselist=False)
     contracts: Mapped[List["Contract"]] = relationship(back_populates="release", cascade="all, delete-orphan")
     payments: Mapped[List["Payment"]] = relationship(back_populates="release", cascade="all, delete-orphan")
+    analysis: Mapped[Optional["TrackAnalysis"]] = relationship(
+        back_populates="release", uselist=False, cascade="all, delete-orphan"
+    )
 
 
 class Consent(Base):
@@ -82,6 +86,17 @@ class Contract(Base):
 
 class MailOutbox(Base):
     __tablename__ = "mail_outbox"
+    __table_args__ = (
+        Index("ix_mail_outbox_status_scheduled_at_id", "status", "scheduled_at", "id"),
+        Index("ix_mail_outbox_status_sent_at", "status", "sent_at"),
+        Index(
+            "ix_mail_outbox_pending",
+            "scheduled_at",
+            "id",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     to_email: Mapped[str] = mapped_column(String(255))
@@ -93,11 +108,29 @@ class MailOutbox(Base):
     status: Mapped[str] = mapped_column(String(32), default="pending")
     attempts: Mapped[int] = mapped_column(Integer, default=0)
     last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     scheduled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
 
+class MailOutboxArchive(Base):
+    __tablename__ = "mail_outbox_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    to_email: Mapped[str] = mapped_column(String(255))
+    subject: Mapped[str] = mapped_column(String(255))
+    html: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    attachments: Mapped[Optional[List[Dict[str, object]]]] = mapped_column(JSON, nullable=True)
+    message_key: Mapped[str] = mapped_column(String(128), index=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
 class Payment(Base):
     __tablename__ = "payments"
 
@@ -116,3 +149,78 @@ class Payment(Base):
 
     release: Mapped[Release] = relationship(back_populates="payments")
     contract: Mapped[Optional[Contract]] = relationship(back_populates="payment")
+
+
+class FsmState(Base):
+    __tablename__ = "fsm_states"
+
+    bot_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    chat_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    thread_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, default=0)
+    destiny: Mapped[str] = mapped_column(String(64), primary_key=True, default="default")
+    state: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    data: Mapped[Optional[Dict[str, object]]] = mapped_column(JSON, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class TelegramFile(Base):
+    __tablename__ = "telegram_files"
+
+    file_unique_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    path: Mapped[str] = mapped_column(String(1024), index=True)
+    sha256: Mapped[str] = mapped_column(String(64))
+    size: Mapped[int] = mapped_column(BigInteger)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class TrackAnalysis(Base):
+    __tablename__ = "track_analyses"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    release_id: Mapped[int] = mapped_column(ForeignKey("releases.id", ondelete="CASCADE"), unique=True, index=True)
+    duration: Mapped[float] = mapped_column(Float)
+    peak_dbfs: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    true_peak_dbfs: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    lufs: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    clipped_samples: Mapped[int] = mapped_column(BigInteger, default=0)
+    envelope: Mapped[Optional[List[List[float]]]] = mapped_column(JSON, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    release: Mapped[Release] = relationship(back_populates="analysis")
+
+
+class BroadcastCampaign(Base):
+    __tablename__ = "broadcast_campaigns"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    text: Mapped[str] = mapped_column(Text)
+    status: Mapped[str] = mapped_column(String(32), default="running", index=True)
+    created_by: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    last_user_id: Mapped[int] = mapped_column(Integer, default=0)
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    sent: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    blocked: Mapped[int] = mapped_column(Integer, default=0)
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_run_at", "status", "run_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    type: Mapped[str] = mapped_column(String(64))
+    payload: Mapped[Dict[str, object]] = mapped_column(JSON, default=dict)
+    dedupe_key: Mapped[Optional[str]] = mapped_column(String(128), unique=True, nullable=True)
+    status: Mapped[str] = mapped_column(String(32), default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
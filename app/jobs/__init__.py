@@ -0,0 +1,4 @@
+from app.jobs.queue import enqueue_job, job_wakeup
+from app.jobs.worker import JobHandler, JobWorker
+
+__all__ = ["JobHandler", "JobWorker", "enqueue_job", "job_wakeup"]
@@ -0,0 +1,3 @@
+from app.jobs.runner import main
+
+main()
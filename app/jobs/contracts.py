@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.contracts import ContractContext, ContractService
+from app.database import models
+from app.jobs.worker import JobHandler
+
+GENERATE_AND_MAIL_CONTRACT = "contract.generate_and_mail"
+
+
+class ContractJobs:
+    def __init__(self, contract_service: ContractService):
+        self.contract_service = contract_service
+
+    def handlers(self) -> Dict[str, JobHandler]:
+        return {GENERATE_AND_MAIL_CONTRACT: self.generate_and_mail}
+
+    async def generate_and_mail(self, session: AsyncSession, payload: Dict[str, Any]) -> None:
+        # Each step is skipped when a previous run already did it, so a retried job neither
+        # renders a second contract nor queues a second email.
+        stmt = (
+            select(models.Payment)
+            .options(
+                selectinload(models.Payment.release).selectinload(models.Release.consent),
+                selectinload(models.Payment.contract),
+            )
+            .where(models.Payment.id == payload["payment_id"])
+        )
+        payment = await session.scalar(stmt)
+        if payment is None:
+            raise RuntimeError(f"Payment {payload['payment_id']} not found")
+        if not payment.release or not payment.release.consent:
+            raise RuntimeError(f"Payment {payment.id} has no release consent")
+        contract = payment.contract
+        if not contract:
+            context = ContractContext(release=payment.release, consent=payment.release.consent, payment=payment)
+            contract = await self.contract_service.create_contract(session, context)
+            payment.contract = contract
+        if not contract.mail_message_key:
+            await self.contract_service.enqueue_email(
+                session,
+                contract,
+                payment.release.consent.email,
+                {
+                    "release": payment.release,
+                    "consent": payment.release.consent,
+                    "payment": payment,
+                },
+            )
+        await session.flush()
+
+
+__all__ = ["ContractJobs", "GENERATE_AND_MAIL_CONTRACT"]
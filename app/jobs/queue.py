@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import crud, models
+from app.utils.wakeup import QueueWakeup
+
+CHANNEL = "jobs"
+
+job_wakeup = QueueWakeup(CHANNEL)
+
+
+async def enqueue_job(
+    session: AsyncSession,
+    job_type: str,
+    payload: Dict[str, Any],
+    dedupe_key: Optional[str] = None,
+    run_at: Optional[datetime] = None,
+    wakeup: Optional[QueueWakeup] = None,
+) -> models.Job:
+    # Runs inside the caller's transaction: the job exists exactly when the caller's changes do.
+    values = {
+        "type": job_type,
+        "payload": payload,
+        "dedupe_key": dedupe_key,
+        "status": "pending",
+        "attempts": 0,
+        "run_at": run_at or datetime.now(timezone.utc),
+    }
+    if dedupe_key is None:
+        job = models.Job(**values)
+        session.add(job)
+        await session.flush()
+    else:
+        # A concurrent enqueue with the same key waits on the unique index and then skips its
+        # insert, so both callers end up with the one job. A job that already gave up is started
+        # over, so a retried callback can still get its work done.
+        stmt = crud.dialect_insert(session, models.Job).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.Job.dedupe_key],
+            set_={
+                "payload": stmt.excluded.payload,
+                "status": "pending",
+                "attempts": 0,
+                "run_at": stmt.excluded.run_at,
+                "last_error": None,
+                "finished_at": None,
+            },
+            where=models.Job.status == "failed",
+        )
+        result = await session.execute(stmt)
+        job = await session.scalar(
+            select(models.Job)
+            .where(models.Job.dedupe_key == dedupe_key)
+            .execution_options(populate_existing=True)
+        )
+        if not result.rowcount:
+            return job
+    await (wakeup or job_wakeup).signal(session)
+    return job
+
+
+__all__ = ["CHANNEL", "enqueue_job", "job_wakeup"]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+
+from app.config import load_settings
+from app.contracts import ContractService
+from app.database.session import Database
+from app.jobs.contracts import ContractJobs
+from app.jobs.worker import JobWorker
+from app.logging import configure_logging, logger
+from app.utils.processes import supervise
+
+
+async def _run_worker(index: int) -> None:
+    settings = load_settings()
+    configure_logging(settings.log_level)
+    database = Database(settings)
+    contract_service = ContractService(settings)
+    worker = JobWorker(
+        settings,
+        database,
+        ContractJobs(contract_service).handlers(),
+        worker_id=f"{socket.gethostname()}:{os.getpid()}:{index}",
+    )
+    try:
+        # Inside the try: renderer processes spawned by an interrupted warm-up must still be stopped.
+        await contract_service.start()
+        logger.info("Job worker %s started", worker.worker_id)
+        await worker.run()
+    finally:
+        await contract_service.shutdown()
+        await database.engine.dispose()
+
+
+def _worker_main(index: int) -> None:
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(_run_worker(index))
+    except KeyboardInterrupt:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("-n", "--processes", type=int, default=None, help="number of worker processes")
+    args = parser.parse_args()
+    settings = load_settings()
+    configure_logging(settings.log_level)
+    count = args.processes or settings.job_processes
+    if count <= 1:
+        _worker_main(0)
+        return
+    supervise(_worker_main, count, "jobs")
+
+
+__all__ = ["main"]
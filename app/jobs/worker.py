@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import Settings
+from app.database import models
+from app.database.session import Database
+from app.jobs.queue import job_wakeup
+from app.utils.leased_queue import LeasedQueueWorker, Outcome
+from app.utils.wakeup import QueueWakeup
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[None]]
+
+
+class JobWorker(LeasedQueueWorker):
+    model = models.Job
+    label = "job"
+    due_column = "run_at"
+    finished_column = "finished_at"
+    active_status = "running"
+    done_status = "done"
+
+    def __init__(
+        self,
+        settings: Settings,
+        database: Database,
+        handlers: Dict[str, JobHandler],
+        worker_id: Optional[str] = None,
+        wakeup: Optional[QueueWakeup] = None,
+    ):
+        super().__init__(
+            database,
+            wakeup or job_wakeup,
+            batch_size=settings.job_concurrency,
+            lease_seconds=settings.job_lease_seconds,
+            max_idle=settings.job_max_idle,
+            retry_schedule=[30, 120, 600, 1800, 7200],
+            worker_id=worker_id,
+        )
+        self.settings = settings
+        self.handlers = handlers
+
+    async def _process(self, job: models.Job) -> Outcome:
+        # Handlers run in their own transaction and must be idempotent: a job whose outcome was
+        # not stored (crash, lost lease) runs again.
+        handler = self.handlers.get(job.type)
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler for job type {job.type}")
+            async with self.database.session() as session:
+                await handler(session, job.payload or {})
+                await session.commit()
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed on attempt %s", job.id, job.type, job.attempts)
+            return Outcome(job, exc)
+        return Outcome(job)
+
+    def _give_up_values(self, job: models.Job, exc: Exception) -> Dict[str, object]:
+        logger.error("Job %s (%s) gave up after %s attempts", job.id, job.type, job.attempts)
+        return super()._give_up_values(job, exc)
+
+
+__all__ = ["JobHandler", "JobWorker"]
@@ -1,3 +1,14 @@
+from app.mailer.archive import archive_sent_mail
+from app.mailer.templating import MailTemplates, RenderedMail
+from app.mailer.transport import SmtpTransport
+from app.mailer.wakeup import mail_wakeup
 from app.mailer.worker import MailerWorker
 
-__all__ = ["MailerWorker"]
+__all__ = [
+    "MailTemplates",
+    "MailerWorker",
+    "RenderedMail",
+    "SmtpTransport",
+    "archive_sent_mail",
+    "mail_wakeup",
+]
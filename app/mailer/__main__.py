@@ -0,0 +1,3 @@
+from app.mailer.runner import main
+
+main()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import DateTime, delete, insert, literal, select
+
+from app.database import models
+from app.database.session import Database
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_COLUMNS = ("id", "to_email", "subject", "html", "text", "attachments", "message_key", "attempts", "sent_at", "created_at")
+
+
+async def archive_sent_mail(database: Database, older_than: timedelta, batch_size: int = 1000) -> int:
+    # Moves delivered mail out of the hot outbox table in short batches, each one its own
+    # transaction, so polling keeps scanning a small table and locks stay brief.
+    outbox = models.MailOutbox
+    archive = models.MailOutboxArchive
+    cutoff = datetime.now(timezone.utc) - older_than
+    moved = 0
+    while True:
+        async with database.session() as session:
+            result = await session.execute(
+                select(outbox.id)
+                .where(outbox.status == "sent", outbox.sent_at < cutoff)
+                .order_by(outbox.sent_at)
+                .limit(batch_size)
+            )
+            ids = list(result.scalars())
+            if not ids:
+                break
+            columns = [getattr(outbox, name) for name in ARCHIVED_COLUMNS]
+            archived_at = literal(datetime.now(timezone.utc), DateTime(timezone=True))
+            await session.execute(
+                insert(archive).from_select(
+                    [*ARCHIVED_COLUMNS, "archived_at"],
+                    select(*columns, archived_at).where(outbox.id.in_(ids)),
+                )
+            )
+            await session.execute(delete(outbox).where(outbox.id.in_(ids)))
+            await session.commit()
+        moved += len(ids)
+        if len(ids) < batch_size:
+            break
+    if moved:
+        logger.info("Archived %s sent mails older than %s", moved, cutoff.isoformat())
+    return moved
+
+
+__all__ = ["archive_sent_mail"]
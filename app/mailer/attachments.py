@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import base64
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Tuple
+
+CacheKey = Tuple[str, int, int]
+
+
+class AttachmentCache:
+    # Holds attachments already base64-encoded into CRLF-terminated 76-character lines, ready to be
+    # spliced into a MIME body. Used from worker threads; the key includes mtime and size so a
+    # replaced file is read again.
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encoded(self, path: Path) -> bytes:
+        stat = os.stat(path)
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        data = base64.encodebytes(path.read_bytes()).replace(b"\n", b"\r\n")
+        with self._lock:
+            self.misses += 1
+            if len(data) <= self.max_bytes and key not in self._entries:
+                self._entries[key] = data
+                self._size += len(data)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return data
+
+
+__all__ = ["AttachmentCache"]
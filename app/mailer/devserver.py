@@ -0,0 +1,135 @@
+"""Minimal SMTP server for local development: accepts every message and keeps it in memory
+or writes it to a directory as ``<n>.eml``. Run with ``python -m app.mailer.devserver``."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from email import message_from_bytes
+from email.message import Message
+from pathlib import Path
+from typing import List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class DevSmtpServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 1025, spool_dir: Optional[Path] = None):
+        self.host = host
+        self.port = port
+        self.spool_dir = spool_dir
+        self.messages: List[Message] = []
+        self.connections = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        if self.spool_dir is not None:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=64 * 1024 * 1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Dev SMTP server listening on %s:%s", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+
+        async def reply(line: str) -> None:
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        await reply("220 localhost dev SMTP")
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                command, _, argument = raw.decode("utf-8", "replace").strip().partition(" ")
+                command = command.upper()
+                if command == "EHLO":
+                    await reply("250-localhost")
+                    await reply("250-AUTH PLAIN LOGIN")
+                    await reply("250 8BITMIME")
+                elif command == "HELO":
+                    await reply("250 localhost")
+                elif command == "AUTH":
+                    await self._authenticate(argument, reader, reply)
+                elif command in ("MAIL", "RCPT", "RSET", "NOOP"):
+                    await reply("250 OK")
+                elif command == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    self._store(await self._read_data(reader))
+                    await reply("250 OK queued")
+                elif command == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def _authenticate(argument: str, reader: asyncio.StreamReader, reply) -> None:
+        mechanism, _, initial = argument.partition(" ")
+        if mechanism.upper() == "LOGIN":
+            await reply("334 VXNlcm5hbWU6")
+            await reader.readline()
+            await reply("334 UGFzc3dvcmQ6")
+            await reader.readline()
+        elif not initial:
+            await reply("334 ")
+            await reader.readline()
+        await reply("235 Authentication successful")
+
+    @staticmethod
+    async def _read_data(reader: asyncio.StreamReader) -> bytes:
+        data = await reader.readuntil(b"\r\n.\r\n")
+        return data[:-3].replace(b"\r\n..", b"\r\n.")
+
+    def _store(self, data: bytes) -> None:
+        message = message_from_bytes(data)
+        self.messages.append(message)
+        if self.spool_dir is not None:
+            path = self.spool_dir / f"{len(self.messages):06d}.eml"
+            path.write_bytes(data)
+        logger.info("Received mail to %s: %s", message.get("To"), message.get("Subject"))
+
+
+async def _serve(host: str, port: int, spool_dir: Optional[Path]) -> None:
+    server = DevSmtpServer(host, port, spool_dir)
+    await server.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local SMTP stand-in for the mailer")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--spool-dir", type=Path, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args.host, args.port, args.spool_dir))
+    except KeyboardInterrupt:
+        pass
+
+
+__all__ = ["DevSmtpServer"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+
+from app.config import load_settings
+from app.database.session import Database
+from app.logging import configure_logging, logger
+from app.mailer.worker import MailerWorker
+from app.utils.processes import supervise
+
+
+async def _run_worker(index: int) -> None:
+    settings = load_settings()
+    configure_logging(settings.log_level)
+    database = Database(settings)
+    worker = MailerWorker(
+        settings,
+        database,
+        worker_id=f"{socket.gethostname()}:{os.getpid()}:{index}",
+        # One process per host is enough to keep the outbox trimmed.
+        archive=index == 0,
+    )
+    logger.info("Mailer worker %s started", worker.worker_id)
+    try:
+        await worker.run()
+    finally:
+        await worker.close()
+        await database.engine.dispose()
+
+
+def _worker_main(index: int) -> None:
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(_run_worker(index))
+    except KeyboardInterrupt:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run mail outbox workers")
+    parser.add_argument("-n", "--processes", type=int, default=None, help="number of worker processes")
+    args = parser.parse_args()
+    settings = load_settings()
+    configure_logging(settings.log_level)
+    count = args.processes or settings.mailer_processes
+    if count <= 1:
+        _worker_main(0)
+        return
+    supervise(_worker_main, count, "mailer")
+
+
+__all__ = ["main"]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined, Template
+
+from app.config import Settings
+
+# Every mail type is a directory holding one template per part.
+PARTS = {"subject": "subject.txt.j2", "html": "body.html.j2", "text": "body.txt.j2"}
+
+_HEADER_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(slots=True)
+class RenderedMail:
+    subject: str
+    html: str
+    text: str
+
+
+def _autoescape(name: Optional[str]) -> bool:
+    return name is not None and name.endswith(".html.j2")
+
+
+class MailTemplates:
+    def __init__(self, template_dir: Path, cache_dir: Optional[Path] = None):
+        self.template_dir = template_dir
+        bytecode_cache = None
+        if cache_dir is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+        self.env = Environment(
+            loader=FileSystemLoader(str(template_dir)),
+            autoescape=_autoescape,
+            undefined=StrictUndefined,
+            bytecode_cache=bytecode_cache,
+            # Templates are compiled once below; nothing should check the files per render.
+            auto_reload=False,
+        )
+        self._templates: Dict[str, Dict[str, Template]] = {}
+        for path in sorted(template_dir.iterdir()):
+            if path.is_dir():
+                self._templates[path.name] = self._compile(path.name)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "MailTemplates":
+        return cls(settings.mail_templates, settings.mail_template_cache_dir)
+
+    @property
+    def names(self) -> List[str]:
+        return sorted(self._templates)
+
+    def render(self, name: str, context: Mapping[str, object]) -> RenderedMail:
+        parts = self._parts(name)
+        return self._render(parts, context)
+
+    def render_many(self, name: str, contexts: Iterable[Mapping[str, object]]) -> List[RenderedMail]:
+        parts = self._parts(name)
+        return [self._render(parts, context) for context in contexts]
+
+    def _compile(self, name: str) -> Dict[str, Template]:
+        parts = {}
+        for part, filename in PARTS.items():
+            try:
+                parts[part] = self.env.get_template(f"{name}/{filename}")
+            except Exception as exc:
+                raise RuntimeError(f"Mail template {name}/{filename} cannot be loaded: {exc}") from exc
+        return parts
+
+    def _parts(self, name: str) -> Dict[str, Template]:
+        parts = self._templates.get(name)
+        if parts is None:
+            raise KeyError(f"Unknown mail template: {name}")
+        return parts
+
+    @staticmethod
+    def _render(parts: Dict[str, Template], context: Mapping[str, object]) -> RenderedMail:
+        # A subject is a single header line; user-supplied values must not be able to break it.
+        subject = _HEADER_WHITESPACE.sub(" ", parts["subject"].render(context)).strip()
+        return RenderedMail(
+            subject=subject,
+            html=parts["html"].render(context),
+            text=parts["text"].render(context),
+        )
+
+
+__all__ = ["MailTemplates", "RenderedMail"]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Errors that leave the connection itself in a usable state.
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+class _Client(smtplib.SMTP):
+    # Records whether the current transaction reached DATA: after that the server may already
+    # have accepted the message, so a failure must not be retried here.
+    data_started = False
+
+    def sendmail(self, *args, **kwargs):
+        self.data_started = False
+        return super().sendmail(*args, **kwargs)
+
+    def data(self, msg):
+        self.data_started = True
+        return super().data(msg)
+
+
+class _Connection:
+    __slots__ = ("client", "last_used")
+
+    def __init__(self) -> None:
+        self.client: Optional[_Client] = None
+        self.last_used = 0.0
+
+    def close(self) -> None:
+        if self.client is None:
+            return
+        try:
+            self.client.quit()
+        except (smtplib.SMTPException, OSError):
+            self.client.close()
+        self.client = None
+
+
+class SmtpTransport:
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        pool_size: int = 4,
+        timeout: float = 30.0,
+        noop_after: float = 15.0,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.noop_after = noop_after
+        self._connections: List[_Connection] = [_Connection() for _ in range(pool_size)]
+        self._idle: Optional[asyncio.Queue[_Connection]] = None
+        # smtplib is blocking; each pooled connection is only ever driven by one thread at a time.
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="smtp")
+        self.connects = 0
+        self.sent = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "SmtpTransport":
+        return cls(
+            settings.smtp_host or "",
+            settings.smtp_port,
+            user=settings.smtp_user,
+            password=settings.smtp_password,
+            use_tls=settings.smtp_use_tls,
+            pool_size=settings.smtp_pool_size,
+            timeout=settings.smtp_timeout,
+        )
+
+    async def send(self, sender: str, recipients: List[str], payload: bytes) -> None:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for connection in self._connections:
+                self._idle.put_nowait(connection)
+        connection = await self._idle.get()
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._send_sync, connection, sender, recipients, payload
+            )
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self._executor, connection.close) for connection in self._connections)
+        )
+        self._executor.shutdown(wait=False)
+
+    def _send_sync(self, connection: _Connection, sender: str, recipients: List[str], payload: bytes) -> None:
+        client = self._ready_client(connection)
+        try:
+            client.sendmail(sender, recipients, payload)
+        except MESSAGE_ERRORS:
+            connection.last_used = time.monotonic()
+            raise
+        except (smtplib.SMTPException, OSError) as exc:
+            connection.close()
+            if client.data_started:
+                # Possibly delivered; the outbox retry schedule decides whether to send again.
+                raise
+            # Nothing was accepted before DATA, so the server may just have dropped a connection
+            # that looked healthy; retry once on a fresh one.
+            logger.info("SMTP connection lost (%s), reconnecting", exc)
+            client = self._ready_client(connection)
+            client.sendmail(sender, recipients, payload)
+        connection.last_used = time.monotonic()
+        self.sent += 1
+
+    def _ready_client(self, connection: _Connection) -> _Client:
+        if connection.client is not None and time.monotonic() - connection.last_used > self.noop_after:
+            try:
+                code, _ = connection.client.noop()
+            except (smtplib.SMTPException, OSError):
+                code = None
+            if code != 250:
+                connection.close()
+        if connection.client is None:
+            connection.client = self._connect()
+        return connection.client
+
+    def _connect(self) -> _Client:
+        client = _Client(self.host, self.port, timeout=self.timeout)
+        try:
+            client.ehlo()
+            if self.use_tls:
+                client.starttls()
+                client.ehlo()
+            if self.user and self.password:
+                client.login(self.user, self.password)
+        except BaseException:
+            client.close()
+            raise
+        self.connects += 1
+        return client
+
+
+__all__ = ["SmtpTransport"]
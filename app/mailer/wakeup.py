@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from app.utils.wakeup import QueueWakeup
+
+CHANNEL = "mail_outbox"
+
+mail_wakeup = QueueWakeup(CHANNEL)
+
+
+__all__ = ["CHANNEL", "mail_wakeup"]
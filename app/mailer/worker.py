@@ -1,73 +1,126 @@
 from __future__ import annotations
 
 import asyncio
+import base64
 import logging
-import smtplib
+import os
+import time
 from datetime import datetime, timedelta, timezone
 from email.message import EmailMessage
+from email.policy import SMTP
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import Settings
 from app.database import models
 from app.database.session import Database
+from app.mailer.archive import archive_sent_mail
+from app.mailer.attachments import AttachmentCache
+from app.mailer.transport import SmtpTransport
+from app.mailer.wakeup import mail_wakeup
+from app.utils.leased_queue import LeasedQueueWorker, Outcome
+from app.utils.wakeup import QueueWakeup
 
 logger = logging.getLogger(__name__)
 
+ARCHIVE_INTERVAL = 3600.0
 
-class MailerWorker:
-    def __init__(self, settings: Settings, database: Database):
+
+class MailerWorker(LeasedQueueWorker):
+    model = models.MailOutbox
+    label = "mail"
+    due_column = "scheduled_at"
+    finished_column = "sent_at"
+    active_status = "sending"
+    done_status = "sent"
+
+    def __init__(
+        self,
+        settings: Settings,
+        database: Database,
+        worker_id: Optional[str] = None,
+        wakeup: Optional[QueueWakeup] = None,
+        archive: bool = False,
+    ):
+        super().__init__(
+            database,
+            wakeup or mail_wakeup,
+            batch_size=settings.mail_batch_size,
+            lease_seconds=settings.mail_lease_seconds,
+            max_idle=settings.mail_max_idle,
+            retry_schedule=[60, 300, 900, 3600, 21600],
+            worker_id=worker_id,
+        )
         self.settings = settings
-        self.database = database
-        self.retry_schedule = [60, 300, 900, 3600, 21600]
-
-    async def run(self, interval: float = 5.0) -> None:
-        while True:
-            processed = await self.process_once()
-            if not processed:
-                await asyncio.sleep(interval)
-
-    async def process_once(self) -> bool:
-        async with self.database.session() as session:
-            mail = await self._fetch_next(session)
-            if not mail:
-                return False
-            mail.status = "sending"
-            mail.attempts += 1
-            await session.flush()
+        self._semaphore = asyncio.Semaphore(settings.mail_concurrency)
+        self.transport = SmtpTransport.from_settings(settings)
+        self.attachments = AttachmentCache(settings.mail_attachment_cache_mb * 1024 * 1024)
+        self.archive = archive and settings.mail_retention_days > 0
+        self._archived_at = 0.0
+
+    async def _on_idle(self) -> None:
+        if not self.archive or time.monotonic() - self._archived_at < ARCHIVE_INTERVAL:
+            return
+        self._archived_at = time.monotonic()
+        try:
+            await archive_sent_mail(self.database, timedelta(days=self.settings.mail_retention_days))
+        except Exception:
+            logger.exception("Mail archiving failed")
+
+    async def _process(self, mail: models.MailOutbox) -> Outcome:
+        async with self._semaphore:
             try:
-                message = self._build_message(mail)
-                await self._send(message)
+                payload = await asyncio.to_thread(self._spooled_payload, mail)
+                await self.transport.send(self.settings.mail_from, [mail.to_email], payload)
             except Exception as exc:
                 logger.exception("Failed to send mail %s", mail.id)
-                self._handle_failure(mail, exc)
-                await session.flush()
-                await session.commit()
-                return True
-            await self._handle_success(session, mail)
-            await session.flush()
-            await session.commit()
-            return True
-
-    async def _fetch_next(self, session: AsyncSession) -> Optional[models.MailOutbox]:
-        now = datetime.now(timezone.utc)
-        stmt = (
-            select(models.MailOutbox)
-            .where(
-                models.MailOutbox.status == "pending",
-                models.MailOutbox.scheduled_at <= now,
-            )
-            .order_by(models.MailOutbox.scheduled_at.asc(), models.MailOutbox.id.asc())
-            .limit(1)
-        )
-        result = await session.execute(stmt)
-        mail = result.scalar_one_or_none()
-        return mail
+                return Outcome(mail, exc)
+        return Outcome(mail)
+
+    async def _store_outcomes(self, outcomes: Sequence[Outcome]) -> List[Dict[str, object]]:
+        results = await super()._store_outcomes(outcomes)
+        finished = [
+            outcome.item.message_key for outcome, values in zip(outcomes, results) if values["status"] != "pending"
+        ]
+        await asyncio.to_thread(self._drop_spooled, finished)
+        return results
 
-    def _build_message(self, mail: models.MailOutbox) -> EmailMessage:
+    async def _record_outcomes(self, session: AsyncSession, outcomes: Sequence[Outcome]) -> None:
+        sent = [outcome.item.message_key for outcome in outcomes if outcome.error is None]
+        if sent:
+            await self._mark_contracts_sent(session, sent)
+
+    def _spool_path(self, message_key: str) -> Path:
+        return self.settings.mail_spool_dir / f"{message_key}.eml"
+
+    def _spooled_payload(self, mail: models.MailOutbox) -> bytes:
+        # The serialized message is built once per row and reused by every retry.
+        path = self._spool_path(mail.message_key)
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            pass
+        message, attachments = self._build_message(mail)
+        payload = message.as_bytes(policy=SMTP)
+        # The email generator re-encodes bodies line by line in Python; attachments go in as
+        # short placeholders and the cached base64 is spliced into the serialized message.
+        for placeholder, encoded in attachments:
+            payload = payload.replace(placeholder, encoded, 1)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(payload)
+        tmp_path.replace(path)
+        return payload
+
+    def _drop_spooled(self, message_keys: List[str]) -> None:
+        for message_key in message_keys:
+            self._spool_path(message_key).unlink(missing_ok=True)
+
+    def _build_message(self, mail: models.MailOutbox) -> Tuple[EmailMessage, List[Tuple[bytes, bytes]]]:
         if not self.settings.mail_from:
             raise RuntimeError("MAIL_FROM is not configured")
         if not self.settings.smtp_host:
@@ -82,62 +135,38 @@ class MailerWorker:
             message.set_content(mail.html or "")
         if mail.html:
             message.add_alternative(mail.html, subtype="html")
+        attachments = []
         for attachment in mail.attachments or []:
             path = self._resolve_attachment_path(attachment.get("path"))
             if not path.exists():
                 raise FileNotFoundError(str(path))
             content_type = attachment.get("content_type", "application/octet-stream")
             maintype, _, subtype = content_type.partition("/")
-            with path.open("rb") as fh:
-                data = fh.read()
+            marker = uuid4().hex.encode()
             message.add_attachment(
-                data,
+                marker,
                 maintype=maintype or "application",
                 subtype=subtype or "octet-stream",
                 filename=attachment.get("filename", path.name),
             )
-        return message
+            attachments.append((base64.b64encode(marker) + b"\r\n", self.attachments.encoded(path)))
+        return message, attachments
 
     def _resolve_attachment_path(self, relative: Optional[str]) -> Path:
         if not relative:
             raise RuntimeError("Attachment path is missing")
         return (self.settings.data_dir / relative).resolve()
 
-    async def _send(self, message: EmailMessage) -> None:
-        host = self.settings.smtp_host
-        port = self.settings.smtp_port
-        with smtplib.SMTP(host, port) as client:
-            client.ehlo()
-            if self.settings.smtp_use_tls:
-                client.starttls()
-                client.ehlo()
-            if self.settings.smtp_user and self.settings.smtp_password:
-                client.login(self.settings.smtp_user, self.settings.smtp_password)
-            client.send_message(message)
-
-    def _handle_failure(self, mail: models.MailOutbox, exc: Exception) -> None:
-        mail.last_error = str(exc)
-        delay = self._next_delay(mail.attempts)
-        if delay is None:
-            mail.status = "failed"
-        else:
-            mail.status = "pending"
-            mail.scheduled_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
-
-    async def _handle_success(self, session: AsyncSession, mail: models.MailOutbox) -> None:
-        now = datetime.now(timezone.utc)
-        mail.status = "sent"
-        mail.sent_at = now
-        mail.last_error = None
-        stmt = select(models.Contract).where(models.Contract.mail_message_key == mail.message_key)
-        result = await session.execute(stmt)
-        contract = result.scalar_one_or_none()
-        if contract and contract.status != "signed":
-            contract.status = "sent"
-            contract.sent_via = "email"
-
-    def _next_delay(self, attempts: int) -> Optional[int]:
-        schedule = self.retry_schedule
-        if attempts <= 0 or attempts > len(schedule):
-            return None
-        return schedule[attempts - 1]
+    async def close(self) -> None:
+        await self.transport.close()
+
+    def _give_up_values(self, mail: models.MailOutbox, exc: Exception) -> Dict[str, object]:
+        return {"status": "failed", "sent_at": None, "scheduled_at": datetime.now(timezone.utc), "last_error": str(exc)}
+
+    async def _mark_contracts_sent(self, session: AsyncSession, message_keys: List[str]) -> None:
+        contract = models.Contract
+        await session.execute(
+            update(contract)
+            .where(contract.mail_message_key.in_(message_keys), contract.status != "signed")
+            .values(status="sent", sent_via="email")
+        )
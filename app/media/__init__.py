@@ -0,0 +1,27 @@
+from app.media.audio import AudioInfo, AudioProbeError, probe_audio
+from app.media.covers import CoverInfo, CoverProcessor, CoverRejected
+from app.media.downloads import (
+    DownloadError,
+    DownloadManager,
+    DownloadResult,
+    DownloadTooLarge,
+    InsufficientDiskSpace,
+)
+from app.media.store import BlobSweeper, FileStore, OrphanReclaimer
+
+__all__ = [
+    "AudioInfo",
+    "AudioProbeError",
+    "BlobSweeper",
+    "CoverInfo",
+    "CoverProcessor",
+    "CoverRejected",
+    "DownloadError",
+    "DownloadManager",
+    "DownloadResult",
+    "DownloadTooLarge",
+    "FileStore",
+    "InsufficientDiskSpace",
+    "OrphanReclaimer",
+    "probe_audio",
+]
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+MP3_SCAN_BYTES = 64 * 1024
+MP3_SYNC_FRAMES = 3
+
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+
+class AudioProbeError(ValueError):
+    pass
+
+
+@dataclass(slots=True)
+class AudioInfo:
+    format: str
+    duration: float
+    sample_rate: int
+    channels: int
+    bitrate: int
+    bit_depth: Optional[int] = None
+    sample_format: Optional[str] = None
+    data_offset: Optional[int] = None
+    data_size: Optional[int] = None
+
+
+@dataclass(slots=True)
+class _Mp3Frame:
+    version: int
+    sample_rate: int
+    bitrate: int
+    channels: int
+    length: int
+    samples: int
+
+
+def probe_audio(path: Path, expected_format: Optional[str] = None) -> AudioInfo:
+    with path.open("rb") as fh:
+        head = fh.read(4)
+        fh.seek(0)
+        if head == b"RIFF":
+            info = probe_wav(fh)
+        elif head[:3] == b"ID3" or (len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+            info = probe_mp3(fh)
+        else:
+            raise AudioProbeError("Unrecognized audio container")
+    if expected_format and info.format != expected_format.lower().lstrip("."):
+        raise AudioProbeError(f"File is {info.format}, but was uploaded as {expected_format}")
+    return info
+
+
+def probe_wav(fh: BinaryIO) -> AudioInfo:
+    file_size = os.fstat(fh.fileno()).st_size
+    header = fh.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        raise AudioProbeError("Not a RIFF/WAVE file")
+    fmt: Optional[Tuple[int, int, int, int, int, int]] = None
+    while True:
+        chunk = fh.read(8)
+        if len(chunk) < 8:
+            raise AudioProbeError("WAV file has no data chunk")
+        chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+        if chunk_id == b"fmt ":
+            chunk_start = fh.tell()
+            fmt = _read_wav_fmt(fh, chunk_size)
+            fh.seek(chunk_start + chunk_size + (chunk_size & 1))
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise AudioProbeError("WAV data chunk precedes fmt chunk")
+            data_offset = fh.tell()
+            available = file_size - data_offset
+            if chunk_size == 0:
+                raise AudioProbeError("WAV data chunk is empty")
+            if chunk_size > available:
+                raise AudioProbeError("WAV file is truncated")
+            break
+        else:
+            fh.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+    audio_format, channels, sample_rate, byte_rate, block_align, bits = fmt
+    return AudioInfo(
+        format="wav",
+        duration=chunk_size / byte_rate,
+        sample_rate=sample_rate,
+        channels=channels,
+        bitrate=byte_rate * 8,
+        bit_depth=bits,
+        sample_format="float" if audio_format == WAVE_FORMAT_IEEE_FLOAT else "pcm",
+        data_offset=data_offset,
+        data_size=chunk_size - chunk_size % block_align,
+    )
+
+
+def _read_wav_fmt(fh: BinaryIO, size: int) -> Tuple[int, int, int, int, int, int]:
+    if size < 16:
+        raise AudioProbeError("WAV fmt chunk is too short")
+    raw = fh.read(min(size, 40))
+    if len(raw) < 16:
+        raise AudioProbeError("WAV fmt chunk is truncated")
+    audio_format, channels, sample_rate, byte_rate, block_align, bits = struct.unpack("<HHIIHH", raw[:16])
+    if audio_format == WAVE_FORMAT_EXTENSIBLE:
+        if len(raw) < 26:
+            raise AudioProbeError("WAV extensible fmt chunk is truncated")
+        audio_format = struct.unpack("<H", raw[24:26])[0]
+    if audio_format == WAVE_FORMAT_PCM:
+        allowed_bits = (8, 16, 24, 32)
+    elif audio_format == WAVE_FORMAT_IEEE_FLOAT:
+        allowed_bits = (32, 64)
+    else:
+        raise AudioProbeError(f"Unsupported WAV encoding 0x{audio_format:04x}")
+    if bits not in allowed_bits:
+        raise AudioProbeError(f"Unsupported WAV bit depth {bits}")
+    if not 1 <= channels <= 8 or not 8000 <= sample_rate <= 384000:
+        raise AudioProbeError(f"Implausible WAV format: {channels} channels at {sample_rate} Hz")
+    if block_align != channels * bits // 8 or byte_rate != sample_rate * block_align:
+        raise AudioProbeError("Inconsistent WAV fmt chunk")
+    return audio_format, channels, sample_rate, byte_rate, block_align, bits
+
+
+def probe_mp3(fh: BinaryIO) -> AudioInfo:
+    file_size = os.fstat(fh.fileno()).st_size
+    start = _skip_id3v2(fh)
+    fh.seek(start)
+    buffer = fh.read(MP3_SCAN_BYTES)
+    offset, frame = _find_first_frame(buffer)
+    audio_start = start + offset
+    audio_end = file_size
+    fh.seek(max(file_size - 128, 0))
+    if fh.read(3) == b"TAG":
+        audio_end -= 128
+    audio_bytes = audio_end - audio_start
+
+    frames = _vbr_frame_count(buffer[offset:offset + frame.length], frame)
+    if frames:
+        duration = frames * frame.samples / frame.sample_rate
+        bitrate = int(audio_bytes * 8 / duration) if duration else frame.bitrate
+    else:
+        bitrate = frame.bitrate
+        duration = audio_bytes * 8 / bitrate
+    return AudioInfo(
+        format="mp3",
+        duration=duration,
+        sample_rate=frame.sample_rate,
+        channels=frame.channels,
+        bitrate=bitrate,
+    )
+
+
+def _skip_id3v2(fh: BinaryIO) -> int:
+    header = fh.read(10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in header[6:10]:
+        if byte & 0x80:
+            raise AudioProbeError("Corrupt ID3v2 tag size")
+        size = (size << 7) | byte
+    footer = 10 if header[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _parse_mp3_header(data: bytes, offset: int) -> Optional[_Mp3Frame]:
+    if offset + 4 > len(data):
+        return None
+    header = struct.unpack(">I", data[offset:offset + 4])[0]
+    if header & 0xFFE00000 != 0xFFE00000:
+        return None
+    version_bits = (header >> 19) & 0x3
+    layer_bits = (header >> 17) & 0x3
+    bitrate_index = (header >> 12) & 0xF
+    rate_index = (header >> 10) & 0x3
+    if version_bits == 1 or layer_bits != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version_bits == 3
+    bitrate = _MP3_BITRATES[1 if mpeg1 else 2][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version_bits][rate_index]
+    padding = (header >> 9) & 0x1
+    channels = 1 if (header >> 6) & 0x3 == 3 else 2
+    samples = 1152 if mpeg1 else 576
+    length = samples // 8 * bitrate // sample_rate + padding
+    return _Mp3Frame(
+        version=version_bits,
+        sample_rate=sample_rate,
+        bitrate=bitrate,
+        channels=channels,
+        length=length,
+        samples=samples,
+    )
+
+
+def _find_first_frame(buffer: bytes) -> Tuple[int, _Mp3Frame]:
+    offset = buffer.find(b"\xff")
+    while offset != -1:
+        frame = _parse_mp3_header(buffer, offset)
+        if frame is not None and _frames_follow(buffer, offset, frame):
+            return offset, frame
+        offset = buffer.find(b"\xff", offset + 1)
+    raise AudioProbeError("No MPEG layer III frames found")
+
+
+def _frames_follow(buffer: bytes, offset: int, frame: _Mp3Frame) -> bool:
+    current = frame
+    for _ in range(MP3_SYNC_FRAMES - 1):
+        offset += current.length
+        if offset + 4 > len(buffer):
+            return True
+        following = _parse_mp3_header(buffer, offset)
+        if following is None or following.sample_rate != frame.sample_rate or following.version != frame.version:
+            return False
+        current = following
+    return True
+
+
+def _vbr_frame_count(data: bytes, frame: _Mp3Frame) -> Optional[int]:
+    if frame.version == 3:
+        side_info = 17 if frame.channels == 1 else 32
+    else:
+        side_info = 9 if frame.channels == 1 else 17
+    xing = 4 + side_info
+    if data[xing:xing + 4] in (b"Xing", b"Info") and len(data) >= xing + 12:
+        flags = struct.unpack(">I", data[xing + 4:xing + 8])[0]
+        if flags & 0x1:
+            return struct.unpack(">I", data[xing + 8:xing + 12])[0] or None
+    if data[36:40] == b"VBRI" and len(data) >= 54:
+        return struct.unpack(">I", data[50:54])[0] or None
+    return None
+
+
+__all__ = ["AudioInfo", "AudioProbeError", "probe_audio", "probe_mp3", "probe_wav"]
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+COVER_FORMATS = {"JPEG", "PNG"}
+
+
+class CoverRejected(ValueError):
+    pass
+
+
+@dataclass(slots=True)
+class CoverInfo:
+    width: int
+    height: int
+    format: str
+    thumbnail: str
+
+
+def _check_cover(img: Image.Image, min_size: int) -> None:
+    if img.format not in COVER_FORMATS:
+        raise CoverRejected(f"Unsupported cover format {img.format}")
+    width, height = img.size
+    if width != height:
+        raise CoverRejected(f"Cover is not square: {width}x{height}")
+    if width < min_size:
+        raise CoverRejected(f"Cover is smaller than {min_size}x{min_size}: {width}x{height}")
+
+
+def _decode_thumbnail(img: Image.Image, size: int) -> Image.Image:
+    # JPEG is decoded at a reduced scale, but every scan is still read, so truncated or
+    # corrupt data fails here.
+    try:
+        img.draft("RGB", (size, size))
+        thumb = img.convert("RGB")
+    except (OSError, SyntaxError, ValueError) as exc:
+        raise CoverRejected(f"Cover cannot be decoded: {exc}") from exc
+    thumb.thumbnail((size, size), Image.Resampling.LANCZOS)
+    return thumb
+
+
+def _write_thumbnail(thumb: Image.Image, thumbnail_path: Path) -> None:
+    thumbnail_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = thumbnail_path.with_name(f".{thumbnail_path.name}.{os.getpid()}.part")
+    try:
+        thumb.save(temp_path, format="JPEG", quality=85, optimize=True, progressive=True)
+        os.replace(temp_path, thumbnail_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def process_cover(path: str, thumbnail_path: str, min_size: int, thumbnail_size: int) -> CoverInfo:
+    # Image.open only parses the header, so size checks reject without decoding. Accepted
+    # covers are always decoded, also when the thumbnail already exists from a previous upload.
+    try:
+        img = Image.open(path)
+    except (OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise CoverRejected(f"Cover cannot be read: {exc}") from exc
+    with img:
+        _check_cover(img, min_size)
+        info = CoverInfo(width=img.size[0], height=img.size[1], format=img.format, thumbnail=thumbnail_path)
+        thumb = _decode_thumbnail(img, thumbnail_size)
+    thumbnail = Path(thumbnail_path)
+    if not thumbnail.exists():
+        _write_thumbnail(thumb, thumbnail)
+    return info
+
+
+class CoverProcessor:
+    def __init__(
+        self,
+        thumbnails_dir: Path,
+        min_size: int = 3000,
+        thumbnail_size: int = 600,
+        max_workers: int = 2,
+    ):
+        self.thumbnails_dir = thumbnails_dir
+        self.min_size = min_size
+        self.thumbnail_size = thumbnail_size
+        self._max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(max_workers * 2)
+
+    def thumbnail_path(self, key: str) -> Path:
+        return self.thumbnails_dir / f"{key}.jpg"
+
+    async def process(self, cover_path: Path, key: Optional[str] = None) -> CoverInfo:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(
+                    self._get_executor(),
+                    process_cover,
+                    str(cover_path),
+                    str(self.thumbnail_path(key or cover_path.stem)),
+                    self.min_size,
+                    self.thumbnail_size,
+                )
+            except BrokenProcessPool:
+                self._executor = None
+                raise
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+        return self._executor
+
+
+__all__ = ["CoverInfo", "CoverProcessor", "CoverRejected", "process_cover"]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+from uuid import uuid4
+
+from aiogram import Bot
+
+from app.utils.files import ensure_parent
+
+
+class DownloadError(Exception):
+    pass
+
+
+class DownloadTooLarge(DownloadError):
+    pass
+
+
+class InsufficientDiskSpace(DownloadError):
+    pass
+
+
+@dataclass(slots=True)
+class DownloadResult:
+    path: Path
+    size: int
+    sha256: str
+
+
+class _LimitedHashingWriter:
+    def __init__(self, fh: BinaryIO, max_bytes: int):
+        self._fh = fh
+        self._max_bytes = max_bytes
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    @property
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+    def write(self, chunk: bytes) -> int:
+        self.size += len(chunk)
+        if self.size > self._max_bytes:
+            raise DownloadTooLarge(f"File exceeds {self._max_bytes} bytes")
+        self._hash.update(chunk)
+        return self._fh.write(chunk)
+
+    def flush(self) -> None:
+        self._fh.flush()
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._fh.seek(offset, whence)
+
+
+class DownloadManager:
+    def __init__(
+        self,
+        max_parallel: int = 4,
+        min_free_bytes: int = 512 * 1024 * 1024,
+        timeout: int = 300,
+        chunk_size: int = 1024 * 1024,
+    ):
+        self._semaphore = asyncio.Semaphore(max_parallel)
+        self._min_free_bytes = min_free_bytes
+        self._timeout = timeout
+        self._chunk_size = chunk_size
+        self._reserved = 0
+
+    async def download(
+        self,
+        bot: Bot,
+        file_id: str,
+        destination: Path,
+        max_bytes: int,
+        declared_size: Optional[int] = None,
+    ) -> DownloadResult:
+        if declared_size and declared_size > max_bytes:
+            raise DownloadTooLarge(f"Declared size {declared_size} exceeds {max_bytes} bytes")
+        ensure_parent(destination)
+        expected = declared_size or max_bytes
+        self._check_disk_space(destination.parent, expected)
+        self._reserved += expected
+        try:
+            async with self._semaphore:
+                return await self._download(bot, file_id, destination, max_bytes)
+        finally:
+            self._reserved -= expected
+
+    def _check_disk_space(self, directory: Path, expected: int) -> None:
+        free = shutil.disk_usage(directory).free
+        if free - self._reserved - expected < self._min_free_bytes:
+            raise InsufficientDiskSpace(f"Not enough free space in {directory}")
+
+    async def _download(self, bot: Bot, file_id: str, destination: Path, max_bytes: int) -> DownloadResult:
+        file = await bot.get_file(file_id)
+        if file.file_size and file.file_size > max_bytes:
+            raise DownloadTooLarge(f"File size {file.file_size} exceeds {max_bytes} bytes")
+        if not file.file_path:
+            raise DownloadError(f"Telegram returned no file_path for {file_id}")
+        temp_path = destination.with_name(f".{destination.name}.{uuid4().hex}.part")
+        try:
+            with temp_path.open("wb") as fh:
+                writer = _LimitedHashingWriter(fh, max_bytes)
+                await bot.download_file(
+                    file.file_path,
+                    destination=writer,
+                    timeout=self._timeout,
+                    chunk_size=self._chunk_size,
+                    seek=False,
+                )
+            os.replace(temp_path, destination)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        return DownloadResult(path=destination, size=writer.size, sha256=writer.hexdigest)
+
+
+__all__ = [
+    "DownloadError",
+    "DownloadManager",
+    "DownloadResult",
+    "DownloadTooLarge",
+    "InsufficientDiskSpace",
+]
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Set
+from uuid import uuid4
+
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import crud, models
+from app.logging import logger
+from app.utils.files import ensure_parent
+
+STAGING_DIR = ".incoming"
+SWEEP_BATCH_SIZE = 500
+
+
+class FileStore:
+    def __init__(self, root: Path, grace_seconds: float = 86400.0):
+        self.root = root
+        self.grace_seconds = grace_seconds
+
+    def path_for(self, sha256: str, suffix: str) -> Path:
+        return self.root / sha256[:2] / f"{sha256}{suffix.lower()}"
+
+    def staging_path(self, suffix: str) -> Path:
+        return self.root / STAGING_DIR / f"{uuid4().hex}{suffix.lower()}"
+
+    def owns(self, path: Path) -> bool:
+        return path.resolve().is_relative_to(self.root.resolve())
+
+    def publish(self, staged: Path, sha256: str, suffix: str) -> Path:
+        target = self.path_for(sha256, suffix)
+        if target.exists():
+            staged.unlink(missing_ok=True)
+            os.utime(target)
+            return target
+        ensure_parent(target)
+        os.replace(staged, target)
+        return target
+
+    def reuse(self, path: Path) -> bool:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def expired(self) -> List[Path]:
+        # Published blobs untouched for the grace period; publish() and reuse() refresh mtime.
+        cutoff = time.time() - self.grace_seconds
+        paths: List[Path] = []
+        if not self.root.is_dir():
+            return paths
+        for shard in os.scandir(self.root):
+            if not shard.is_dir() or shard.name == STAGING_DIR:
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    paths.append(self.root / shard.name / entry.name)
+        return paths
+
+    def purge_staging(self) -> int:
+        # Staged files are renamed away on success; old ones are leftovers of crashed uploads.
+        staging = self.root / STAGING_DIR
+        cutoff = time.time() - self.grace_seconds
+        removed = 0
+        if not staging.is_dir():
+            return removed
+        for entry in os.scandir(staging):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                Path(entry.path).unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    async def referenced(self, session: AsyncSession, paths: Sequence[Path]) -> Set[str]:
+        values = [str(path) for path in paths]
+        release = models.Release
+        stmt = select(release.track_file, release.cover_file).where(
+            or_(release.track_file.in_(values), release.cover_file.in_(values))
+        )
+        result = await session.execute(stmt)
+        return {value for row in result for value in row}
+
+    async def reference_count(self, session: AsyncSession, path: Path) -> int:
+        value = str(path)
+        stmt = select(func.count(models.Release.id)).where(
+            or_(models.Release.track_file == value, models.Release.cover_file == value)
+        )
+        result = await session.execute(stmt)
+        return int(result.scalar_one())
+
+    async def discard(self, session: AsyncSession, path: Path) -> bool:
+        if not self.owns(path) or not path.exists():
+            return False
+        if time.time() - path.stat().st_mtime < self.grace_seconds:
+            return False
+        if await self.reference_count(session, path):
+            return False
+        await crud.delete_telegram_files(session, str(path))
+        path.unlink(missing_ok=True)
+        logger.info("Removed unreferenced blob %s", path)
+        return True
+
+
+class OrphanReclaimer:
+    def __init__(self, session_factory, stores: Sequence[FileStore]):
+        self._session_factory = session_factory
+        self._stores = list(stores)
+        self._tasks: set[asyncio.Task] = set()
+
+    def __call__(self, key: StorageKey, paths: List[str]) -> None:
+        if not paths:
+            return
+        logger.info("Reclaiming uploads of abandoned flow %s:%s", key.chat_id, key.user_id)
+        task = asyncio.get_running_loop().create_task(self.reclaim(paths))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def reclaim(self, paths: Iterable[str]) -> None:
+        async with self._session_factory() as session:
+            for raw_path in paths:
+                path = Path(raw_path)
+                store = self._owner(path)
+                if store is None:
+                    continue
+                try:
+                    await store.discard(session, path)
+                except Exception:
+                    logger.exception("Failed to reclaim %s", path)
+            await session.commit()
+
+    def _owner(self, path: Path) -> Optional[FileStore]:
+        for store in self._stores:
+            if store.owns(path):
+                return store
+        return None
+
+
+class BlobSweeper:
+    # Abandoned flows are not visible with every FSM storage (SQL rows never expire), so blobs
+    # are reclaimed by age and release references alone.
+    def __init__(self, session_factory, stores: Sequence[FileStore], interval: float = 3600.0):
+        self._session_factory = session_factory
+        self._stores = list(stores)
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def sweep(self) -> int:
+        removed = 0
+        for store in self._stores:
+            staged = await asyncio.to_thread(store.purge_staging)
+            if staged:
+                logger.info("Removed %s stale staged uploads from %s", staged, store.root)
+            candidates = await asyncio.to_thread(store.expired)
+            for start in range(0, len(candidates), SWEEP_BATCH_SIZE):
+                batch = candidates[start : start + SWEEP_BATCH_SIZE]
+                async with self._session_factory() as session:
+                    referenced = await store.referenced(session, batch)
+                    for path in batch:
+                        if str(path) not in referenced and await store.discard(session, path):
+                            removed += 1
+                    await session.commit()
+        return removed
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Blob sweep failed")
+
+
+__all__ = ["BlobSweeper", "FileStore", "OrphanReclaimer"]
@@ -1,4 +1,14 @@
-
 from .files import ensure_parent, read_text, sanitize_filename
+from .processes import supervise
+from .ratelimit import BucketMap, TokenBucket
+from .wakeup import QueueWakeup
 
-__all__ = ["ensure_parent", "read_text", "sanitize_filename"]
+__all__ = [
+    "BucketMap",
+    "QueueWakeup",
+    "TokenBucket",
+    "ensure_parent",
+    "read_text",
+    "sanitize_filename",
+    "supervise",
+]
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, bindparam, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.session import Database
+from app.utils.wakeup import QueueWakeup
+
+logger = logging.getLogger(__name__)
+
+# Without LISTEN/NOTIFY rows enqueued by other processes are only found by polling.
+POLL_INTERVAL = 5.0
+
+
+@dataclass(slots=True)
+class Outcome:
+    item: Any
+    error: Optional[Exception] = None
+
+
+class LeasedQueueWorker:
+    # Claims due rows of a database-backed queue under a lease, processes them concurrently and
+    # writes back the outcome with retry backoff. Subclasses name the table and its columns and
+    # implement _process.
+    model: Any
+    label: str
+    due_column: str
+    finished_column: str
+    active_status: str
+    done_status: str
+
+    def __init__(
+        self,
+        database: Database,
+        wakeup: QueueWakeup,
+        batch_size: int,
+        lease_seconds: float,
+        max_idle: float,
+        retry_schedule: List[int],
+        worker_id: Optional[str] = None,
+    ):
+        self.database = database
+        self.wakeup = wakeup
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_idle = max_idle
+        self.retry_schedule = retry_schedule
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+    async def run(self, max_idle: Optional[float] = None) -> None:
+        max_idle = max_idle or self.max_idle
+        listener = None
+        if self.database.engine.dialect.name == "postgresql":
+            listener = asyncio.create_task(self.wakeup.listen(self.database.engine.url))
+        else:
+            max_idle = min(max_idle, POLL_INTERVAL)
+        try:
+            while True:
+                if await self.process_once():
+                    continue
+                await self._on_idle()
+                await self.wakeup.wait(await self._idle_delay(max_idle))
+        finally:
+            if listener is not None:
+                listener.cancel()
+                await asyncio.gather(listener, return_exceptions=True)
+
+    async def _on_idle(self) -> None:
+        pass
+
+    async def _idle_delay(self, max_idle: float) -> float:
+        # Sleep until the earliest retry or lease expiry; new rows wake the worker earlier.
+        table = self.model
+        due = getattr(table, self.due_column)
+        async with self.database.session() as session:
+            next_due = await session.scalar(select(func.min(due)).where(table.status == "pending"))
+            next_expiry = await session.scalar(
+                select(func.min(table.lease_expires_at)).where(table.status == self.active_status)
+            )
+        now = datetime.now(timezone.utc)
+        delay = max_idle
+        for moment in (next_due, next_expiry):
+            if moment is None:
+                continue
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            delay = min(delay, (moment - now).total_seconds())
+        return max(delay, 0.05)
+
+    async def process_once(self) -> bool:
+        items = await self._claim_batch()
+        if not items:
+            return False
+        heartbeat = asyncio.create_task(self._heartbeat([item.id for item in items]))
+        try:
+            outcomes = await asyncio.gather(*(self._process(item) for item in items))
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        await self._store_outcomes(outcomes)
+        return True
+
+    async def _process(self, item: Any) -> Outcome:
+        raise NotImplementedError
+
+    async def _claim_batch(self) -> List[Any]:
+        now = datetime.now(timezone.utc)
+        table = self.model
+        due_at = getattr(table, self.due_column)
+        # Rows left active by a crashed or stalled worker come back once their lease expires.
+        claimable = or_(
+            and_(table.status == "pending", due_at <= now),
+            and_(table.status == self.active_status, table.lease_expires_at < now),
+        )
+        due = select(table).where(claimable).order_by(due_at.asc(), table.id.asc()).limit(self.batch_size)
+        lease = {
+            "status": self.active_status,
+            "lease_owner": self.worker_id,
+            "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+        }
+        async with self.database.session() as session:
+            if self.database.engine.dialect.name == "postgresql":
+                # Concurrent workers skip rows another worker has already locked.
+                result = await session.execute(due.with_for_update(skip_locked=True))
+                items = list(result.scalars())
+                for item in items:
+                    for name, value in lease.items():
+                        setattr(item, name, value)
+                    item.attempts += 1
+            else:
+                # The claimable check in the UPDATE itself makes the claim atomic without row locks.
+                result = await session.execute(
+                    update(table)
+                    .where(table.id.in_(due.with_only_columns(table.id).scalar_subquery()), claimable)
+                    .values(attempts=table.attempts + 1, **lease)
+                    .returning(table)
+                )
+                items = list(result.scalars())
+            await session.commit()
+        return items
+
+    async def _heartbeat(self, item_ids: List[int]) -> None:
+        table = self.model
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+            try:
+                async with self.database.session() as session:
+                    await session.execute(
+                        update(table)
+                        .where(
+                            table.id.in_(item_ids),
+                            table.lease_owner == self.worker_id,
+                            table.status == self.active_status,
+                        )
+                        .values(lease_expires_at=expires_at)
+                    )
+                    await session.commit()
+            except Exception:
+                logger.exception("Failed to extend %s leases", self.label)
+
+    async def _store_outcomes(self, outcomes: Sequence[Outcome]) -> List[Dict[str, object]]:
+        table = self.model.__table__
+        # Only rows still leased by this worker are written back; a lost lease means another
+        # worker has taken the row over.
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"), table.c.lease_owner == self.worker_id)
+            .values(
+                status=bindparam("b_status"),
+                last_error=bindparam("b_last_error"),
+                lease_owner=None,
+                lease_expires_at=None,
+                **{
+                    self.due_column: bindparam(f"b_{self.due_column}"),
+                    self.finished_column: bindparam(f"b_{self.finished_column}"),
+                },
+            )
+        )
+        results = []
+        for outcome in outcomes:
+            if outcome.error is None:
+                results.append(self._success_values(outcome.item))
+            else:
+                results.append(self._failure_values(outcome.item, outcome.error))
+        rows = [
+            {"b_id": outcome.item.id, **{f"b_{name}": value for name, value in values.items()}}
+            for outcome, values in zip(outcomes, results)
+        ]
+        async with self.database.session() as session:
+            await session.execute(stmt, rows)
+            await self._record_outcomes(session, outcomes)
+            await session.commit()
+        return results
+
+    async def _record_outcomes(self, session: AsyncSession, outcomes: Sequence[Outcome]) -> None:
+        # Extra writes committed together with the outcomes.
+        pass
+
+    def _success_values(self, item: Any) -> Dict[str, object]:
+        return {
+            "status": self.done_status,
+            self.due_column: getattr(item, self.due_column),
+            self.finished_column: datetime.now(timezone.utc),
+            "last_error": None,
+        }
+
+    def _failure_values(self, item: Any, exc: Exception) -> Dict[str, object]:
+        delay = self._next_delay(item.attempts)
+        if delay is None:
+            return self._give_up_values(item, exc)
+        return {
+            "status": "pending",
+            self.due_column: datetime.now(timezone.utc) + timedelta(seconds=delay),
+            self.finished_column: None,
+            "last_error": str(exc),
+        }
+
+    def _give_up_values(self, item: Any, exc: Exception) -> Dict[str, object]:
+        return {
+            "status": "failed",
+            self.due_column: getattr(item, self.due_column),
+            self.finished_column: datetime.now(timezone.utc),
+            "last_error": str(exc),
+        }
+
+    def _next_delay(self, attempts: int) -> Optional[int]:
+        schedule = self.retry_schedule
+        if attempts <= 0 or attempts > len(schedule):
+            return None
+        return schedule[attempts - 1]
+
+
+__all__ = ["POLL_INTERVAL", "LeasedQueueWorker", "Outcome"]
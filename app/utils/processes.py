@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import multiprocessing
+import signal
+import time
+from typing import Callable, Dict
+
+from app.logging import logger
+
+RESTART_DELAY = 5.0
+
+
+def _start(context, target: Callable[[int], None], name: str, index: int) -> multiprocessing.Process:
+    process = context.Process(target=target, args=(index,), name=f"{name}-{index}")
+    process.start()
+    return process
+
+
+def supervise(target: Callable[[int], None], count: int, name: str) -> None:
+    # Runs `count` copies of a module-level target in spawned processes and restarts any that exit
+    # until SIGTERM or SIGINT.
+    context = multiprocessing.get_context("spawn")
+    processes: Dict[int, multiprocessing.Process] = {
+        index: _start(context, target, name, index) for index in range(count)
+    }
+    stopping = False
+
+    def stop(*_) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info("Started %s %s processes", count, name)
+    try:
+        while not stopping:
+            time.sleep(1.0)
+            for index, process in processes.items():
+                if process.is_alive() or stopping:
+                    continue
+                # Leases held by the dead process expire and are picked up by the others.
+                logger.error("%s process %s exited with code %s, restarting", name, index, process.exitcode)
+                time.sleep(RESTART_DELAY)
+                processes[index] = _start(context, target, name, index)
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in processes.values():
+            process.join()
+
+
+__all__ = ["supervise"]
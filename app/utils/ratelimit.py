@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def peek(self, now: float, cost: float = 1.0) -> bool:
+        self._refill(now)
+        return self.tokens >= cost
+
+    def consume(self, now: float, cost: float = 1.0) -> bool:
+        self._refill(now)
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+    def retry_after(self, now: float, cost: float = 1.0) -> float:
+        self._refill(now)
+        if self.tokens >= cost or self.rate <= 0:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class BucketMap(Generic[KeyT]):
+    # Past max_entries, buckets that have refilled completely are dropped: a recreated
+    # bucket starts full, so for them nothing changes. A key still short of tokens keeps its
+    # bucket however many there are; the map can only outgrow max_entries by keys active
+    # within one refill period.
+    def __init__(self, rate: float, capacity: float, max_entries: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_entries = max_entries
+        self._clock = clock
+        self._buckets: "OrderedDict[KeyT, TokenBucket]" = OrderedDict()
+        self._sweep_at = max_entries
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def get(self, key: KeyT, now: Optional[float] = None) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            now = self._clock() if now is None else now
+            if len(self._buckets) >= self._sweep_at:
+                self._sweep(now)
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity, now)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def consume(self, key: KeyT, cost: float = 1.0) -> bool:
+        now = self._clock()
+        return self.get(key, now).consume(now, cost)
+
+    def _sweep(self, now: float) -> None:
+        for key in [key for key, bucket in self._buckets.items() if bucket.full(now)]:
+            del self._buckets[key]
+        # When most keys are still refilling, the next pass waits for the map to double, so
+        # sweeps stay amortized O(1) per new key.
+        self._sweep_at = max(self.max_entries, 2 * len(self._buckets))
+
+
+__all__ = ["BucketMap", "TokenBucket"]
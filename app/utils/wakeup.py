@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 5.0
+_PENDING_KEY = "pending_wakeups"
+
+
+def _notify_pending(session) -> None:
+    for wakeup in session.info.pop(_PENDING_KEY, ()):
+        wakeup.notify()
+
+
+def _drop_pending(session, transaction) -> None:
+    # Runs after after_commit, and on rollback or close without a commit: whatever is left
+    # belongs to a transaction that will never commit. Savepoints end inside it and are ignored.
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+class QueueWakeup:
+    # Wakes the workers of one database-backed queue when a row is enqueued.
+    def __init__(self, channel: str) -> None:
+        self.channel = channel
+        self._event = asyncio.Event()
+        self.notified = 0
+
+    def notify(self) -> None:
+        self.notified += 1
+        self._event.set()
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._event.clear()
+        return True
+
+    async def signal(self, session: AsyncSession) -> None:
+        # Both signals fire only once the enqueuing transaction commits, so a woken worker
+        # always finds the new row. NOTIFY is itself transactional on PostgreSQL.
+        sync_session = session.sync_session
+        if not event.contains(sync_session, "after_commit", _notify_pending):
+            event.listen(sync_session, "after_commit", _notify_pending)
+            event.listen(sync_session, "after_transaction_end", _drop_pending)
+        sync_session.info.setdefault(_PENDING_KEY, set()).add(self)
+        if session.bind.dialect.name == "postgresql":
+            await session.execute(text("SELECT pg_notify(:channel, '')"), {"channel": self.channel})
+
+    async def listen(self, url: URL) -> None:
+        try:
+            import psycopg
+        except ImportError as exc:
+            raise RuntimeError("Queue wakeups over LISTEN/NOTIFY require psycopg") from exc
+        conninfo = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as connection:
+                    await connection.execute(f"LISTEN {self.channel}")
+                    # Anything committed while we were not listening is picked up by this wakeup.
+                    self.notify()
+                    async for _ in connection.notifies():
+                        self.notify()
+            except psycopg.Error as exc:
+                logger.warning("LISTEN %s connection failed: %s", self.channel, exc)
+            await asyncio.sleep(RECONNECT_DELAY)
+
+
+__all__ = ["QueueWakeup"]
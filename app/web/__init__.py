@@ -1,4 +1,4 @@
 
-from app.web.app import create_web_app
+from app.web.app import create_web_app, run_web_app, setup_bot_webhook
 
-__all__ = ["create_web_app"]
+__all__ = ["create_web_app", "run_web_app", "setup_bot_webhook"]
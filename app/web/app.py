@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation
 from typing import Dict
 
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 from aiohttp import web
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.config import Settings
-from app.contracts import ContractContext, ContractService
 from app.database import models
 from app.database.session import Database
+from app.jobs import enqueue_job
+from app.jobs.contracts import GENERATE_AND_MAIL_CONTRACT
+from app.logging import logger
 from app.payments.robokassa_client import RobokassaClient
 
 
@@ -28,7 +33,6 @@ def create_web_app(settings: Settings, database: Database, bot) -> web.Applicati
     app["settings"] = settings
     app["database"] = database
     app["bot"] = bot
-    app["contract_service"] = ContractService(settings)
     app["robokassa_client"] = RobokassaClient(settings)
 
     async def healthcheck(_: web.Request) -> web.Response:
@@ -100,35 +104,14 @@ def create_web_app(settings: Settings, database: Database, bot) -> web.Applicati
                 await session.flush()
                 await session.commit()
                 return web.Response(status=422, text="consent not found")
-            contract_service: ContractService = request.app["contract_service"]
-            contract = payment.contract
-            if not contract:
-                context = ContractContext(
-                    release=payment.release,
-                    consent=payment.release.consent,
-                    payment=payment,
-                )
-                contract = await contract_service.create_contract(session, context)
-                payment.contract = contract
-            if not contract.mail_message_key:
-                accept_link = contract_service.build_accept_link(contract)
-                subject = f"Договор по релизу {payment.release.track_name}"
-                html_body = (
-                    f"<p>Здравствуйте, {payment.release.consent.full_name}!</p>"
-                    f"<p>К договору прикреплён файл, вы можете подписать его по ссылке: "
-                    f"<a href=\"{accept_link}\">Подписать договор</a>.</p>"
-                )
-                text_body = (
-                    f"Здравствуйте, {payment.release.consent.full_name}!\n"
-                    f"Договор прикреплён к письму. Подписать: {accept_link}"
-                )
-                await contract_service.enqueue_email(
+            if not payment.contract or not payment.contract.mail_message_key:
+                # The contract PDF and email are produced by `python -m app.jobs`; the job commits
+                # together with the payment, so a retried callback never loses or duplicates it.
+                await enqueue_job(
                     session,
-                    contract,
-                    payment.release.consent.email,
-                    subject,
-                    html_body,
-                    text_body,
+                    GENERATE_AND_MAIL_CONTRACT,
+                    {"payment_id": payment.id},
+                    dedupe_key=f"contract:{payment.id}",
                 )
             await session.flush()
             await session.commit()
@@ -159,4 +142,35 @@ def create_web_app(settings: Settings, database: Database, bot) -> web.Applicati
     return app
 
 
-__all__ = ["create_web_app"]
+def setup_bot_webhook(app: web.Application, dispatcher: Dispatcher, bot: Bot, settings: Settings) -> None:
+    SimpleRequestHandler(
+        dispatcher=dispatcher,
+        bot=bot,
+        secret_token=settings.webhook_secret,
+    ).register(app, path=settings.webhook_path)
+    setup_application(app, dispatcher, bot=bot)
+
+    async def on_startup(_: web.Application) -> None:
+        logger.info("Setting webhook to %s", settings.webhook_path)
+        await bot.set_webhook(
+            settings.webhook_url,
+            secret_token=settings.webhook_secret,
+            allowed_updates=dispatcher.resolve_used_update_types(),
+        )
+
+    app.on_startup.append(on_startup)
+
+
+async def run_web_app(app: web.Application, settings: Settings) -> None:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, settings.web_host, settings.web_port)
+    await site.start()
+    logger.info("Web server listening on %s:%s", settings.web_host, settings.web_port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+__all__ = ["create_web_app", "run_web_app", "setup_bot_webhook"]
@@ -0,0 +1,109 @@
+"""Per-update routing cost with and without the exact-text dispatch table.
+
+Run from the repository root: ``python -m benchmarks.bench_routing``.
+Bot API calls are answered by an in-process session, so the numbers reflect
+middleware, filter and handler overhead only.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Tuple
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Update
+
+from app.bot.catalog import build_catalog_view
+from app.bot.handlers import menu, release
+from app.bot.keyboards.main import BACK_BUTTON
+from app.bot.routing import TextDispatchMiddleware
+from app.bot.states import MenuStates, PCBuildStates, ReleaseStates
+from app.catalog import CatalogStore
+from app.config import Settings
+
+ITERATIONS = 2000
+BOT_ID = 42
+
+SCENARIOS: List[Tuple[str, Optional[str], str]] = [
+    ("main menu: music", None, menu.MENU_MUSIC),
+    ("main menu: contacts", None, menu.MENU_CONTACTS),
+    ("pc: ready builds", MenuStates.pc.state, menu.PC_READY),
+    ("pc wishes: back", PCBuildStates.wishes.state, BACK_BUTTON),
+    ("release email: back", ReleaseStates.contact_email.state, BACK_BUTTON),
+    ("free text, no handler", None, "привет"),
+]
+
+
+class NullSession(BaseSession):
+    async def make_request(self, bot: Bot, method: Any, timeout: Optional[int] = None) -> Any:
+        return True
+
+    async def stream_content(self, *args: Any, **kwargs: Any):
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+def build_dispatcher() -> Dispatcher:
+    settings = Settings(bot_token="42:TEST", admin_username="", base_dir=None, db_url="", public_base_url=None)
+    dp = Dispatcher(storage=MemoryStorage())
+    dp["catalog"] = CatalogStore(settings.catalog_path.resolve(), build_catalog_view, reload_interval=0)
+    dp.include_router(menu.router)
+    dp.include_router(release.router)
+    return dp
+
+
+def make_update(bot: Bot, update_id: int, text: str) -> Update:
+    payload = {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(datetime.now(timezone.utc).timestamp()),
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Bench"},
+            "text": text,
+        },
+    }
+    return Update.model_validate(payload, context={"bot": bot})
+
+
+async def measure(dp: Dispatcher, bot: Bot, state: Optional[str], text: str) -> float:
+    key = StorageKey(bot_id=BOT_ID, chat_id=1, user_id=1)
+    updates = [make_update(bot, i, text) for i in range(ITERATIONS)]
+    elapsed = 0.0
+    for update in updates:
+        await dp.storage.set_state(key, state)
+        started = time.perf_counter()
+        await dp.feed_update(bot, update)
+        elapsed += time.perf_counter() - started
+    return elapsed / ITERATIONS * 1e6
+
+
+async def main() -> None:
+    dp = build_dispatcher()
+    bot = Bot(token=f"{BOT_ID}:TEST", session=NullSession())
+    table = TextDispatchMiddleware.from_router(dp)
+
+    results = []
+    for name, state, text in SCENARIOS:
+        await measure(dp, bot, state, text)
+        before = await measure(dp, bot, state, text)
+        dp.message.outer_middleware.register(table)
+        await measure(dp, bot, state, text)
+        after = await measure(dp, bot, state, text)
+        dp.message.outer_middleware.unregister(table)
+        results.append((name, before, after))
+
+    print(f"{'scenario':<24}{'chain, µs':>12}{'table, µs':>12}{'speedup':>10}")
+    for name, before, after in results:
+        print(f"{name:<24}{before:>12.1f}{after:>12.1f}{before / after:>9.2f}x")
+    print(f"table entries: {table.stats()['entries']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())